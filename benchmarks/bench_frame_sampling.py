@@ -0,0 +1,146 @@
+"""
+Frame sampling benchmark.
+
+Writes a synthetic clip and reports kept frames/sec for the legacy
+`cap.read()` loop against every sampler backend, then checks that each
+backend returns the right frames for a random explicit index set (max
+mean abs pixel difference against the legacy decode; ~0 means exact).
+The ffmpeg backend is skipped when no ffmpeg binary is on PATH.
+
+    python -m benchmarks.bench_frame_sampling [--frames 900] [--rate 5] [--picks 60]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import cv2
+import numpy as np
+
+from src.processing.frame_sampler import BACKENDS, iter_sampled_frames
+
+
+def _write_synthetic_clip(
+    path: Path,
+    n_frames: int,
+    size: Tuple[int, int],
+    fps: float = 30.0,
+) -> None:
+    width, height = size
+    writer = cv2.VideoWriter(
+        str(path),
+        cv2.VideoWriter_fourcc(*"mp4v"),
+        fps,
+        (width, height),
+    )
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+    for i in range(n_frames):
+        frame = background.copy()
+        x = (i * 7) % (width - 200)
+        y = (i * 3) % (height - 200)
+        cv2.rectangle(frame, (x, y), (x + 200, y + 200), (0, 200, 255), -1)
+        cv2.putText(
+            frame, str(i), (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3
+        )
+        writer.write(frame)
+
+    writer.release()
+
+
+def _legacy_loop(path: Path, rate: int) -> Iterator[np.ndarray]:
+    cap = cv2.VideoCapture(str(path))
+    frame_idx = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_idx % rate == 0:
+            yield frame
+        frame_idx += 1
+    cap.release()
+
+
+def _exactness(path: Path, backends: List[str], picks: int, n_frames: int) -> None:
+    indices = sorted(random.Random(0).sample(range(n_frames), min(picks, n_frames)))
+    reference: Dict[int, np.ndarray] = {}
+    for i, frame in enumerate(_legacy_loop(path, 1)):
+        if i in indices:
+            reference[i] = frame.astype(np.int16)
+
+    print(f"\n{len(indices)} random explicit indices")
+    print(f"{'backend':<10}{'kept':>8}{'max diff':>10}")
+    for backend in backends:
+        diffs = [
+            float(np.abs(frame.astype(np.int16) - reference[i]).mean())
+            for i, frame in iter_sampled_frames(path, indices=indices, backend=backend)
+        ]
+        print(f"{backend:<10}{len(diffs):>8}{max(diffs, default=float('nan')):>10.2f}")
+
+
+def _time(fn: Callable[[], Iterator]) -> Tuple[int, float]:
+    start = time.perf_counter()
+    kept = sum(1 for _ in fn())
+    return kept, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=900)
+    parser.add_argument("--rate", type=int, default=5)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--picks", type=int, default=60)
+    args = parser.parse_args()
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="bench-sampling-"))
+    clip = tmp_dir / "synthetic.mp4"
+
+    try:
+        _write_synthetic_clip(clip, args.frames, (args.width, args.height))
+
+        runs = {"legacy": lambda: _legacy_loop(clip, args.rate)}
+        for backend in BACKENDS:
+            if backend == "ffmpeg" and shutil.which("ffmpeg") is None:
+                continue
+            runs[backend] = (
+                lambda b=backend: iter_sampled_frames(
+                    clip, sample_rate=args.rate, backend=b
+                )
+            )
+
+        print(
+            f"{args.frames} frames @ {args.width}x{args.height}, "
+            f"keeping every {args.rate}th"
+        )
+        print(f"{'backend':<10}{'kept':>8}{'seconds':>10}{'kept fps':>12}{'speedup':>10}")
+
+        baseline = None
+        for name, fn in runs.items():
+            kept, seconds = _time(fn)
+            fps = kept / seconds if seconds else float("inf")
+            baseline = baseline or fps
+            print(
+                f"{name:<10}{kept:>8}{seconds:>10.3f}{fps:>12.1f}"
+                f"{fps / baseline:>9.2f}x"
+            )
+
+        _exactness(
+            clip,
+            [name for name in runs if name != "legacy"],
+            args.picks,
+            args.frames,
+        )
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Item tracking benchmark.
+
+Compares the legacy scalar greedy IoU clustering with the vectorized
+`track_items` on synthetic detections and checks both produce the same
+clusters. A second, single-class crowd scene compares dense head
+matching with the spatial grid index.
+
+    python -m benchmarks.bench_item_tracking [--detections 20000] [--crowd 3000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from src.detection.detection_batch import DetectionBatch
+from src.detection.item_tracker import _cluster_greedy, _iou, track_items
+from src.processing.frame_store import FrameRef
+
+
+def synthetic_detections(
+    n: int,
+    n_objects: int,
+    n_classes: int = 3,
+    seed: int = 0,
+) -> DetectionBatch:
+    """
+    `n_objects` boxes jittering around fixed positions, observed in
+    random order across 2000 frames.
+    """
+    rng = np.random.default_rng(seed)
+
+    centers = rng.uniform(100, 1800, size=(n_objects, 2))
+    sizes = rng.uniform(40, 300, size=(n_objects, 2))
+    classes = rng.integers(0, n_classes, size=n_objects)
+
+    obj = rng.integers(0, n_objects, size=n)
+    jitter = rng.normal(0, 8, size=(n, 4))
+
+    half = sizes[obj] / 2
+    boxes = np.concatenate([centers[obj] - half, centers[obj] + half], axis=1) + jitter
+
+    frames = [FrameRef("bench", i) for i in range(2000)]
+
+    return DetectionBatch(
+        frames=frames,
+        frame_index=np.sort(rng.integers(0, len(frames), size=n)).astype(np.int32),
+        class_id=classes[obj].astype(np.int32),
+        confidence=rng.uniform(0.3, 1.0, size=n).astype(np.float32),
+        bbox=np.clip(boxes, 0, None).astype(np.int32),
+        class_names={i: f"class{i}" for i in range(n_classes)},
+    )
+
+
+def legacy_track_items(detections: List[Dict], iou_threshold: float = 0.5) -> List[Dict]:
+    grouped: Dict[str, List[Dict]] = defaultdict(list)
+    for det in detections:
+        grouped[det["item"]].append(det)
+
+    final_items: List[Dict] = []
+    for item_name, item_detections in grouped.items():
+        clusters: List[List[Dict]] = []
+        for det in item_detections:
+            for cluster in clusters:
+                if _iou(det["bbox"], cluster[0]["bbox"]) >= iou_threshold:
+                    cluster.append(det)
+                    break
+            else:
+                clusters.append([det])
+
+        for idx, cluster in enumerate(clusters):
+            best = max(cluster, key=lambda d: d["confidence"])
+            final_items.append(
+                {
+                    "id": f"{item_name}_{idx}",
+                    "item": item_name,
+                    "frame": best["frame"],
+                    "confidence": float(best["confidence"]),
+                    "bbox": best["bbox"],
+                    "frames_seen": len(cluster),
+                }
+            )
+    return final_items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--detections", type=int, default=20000)
+    parser.add_argument("--objects", type=int, default=600)
+    parser.add_argument("--crowd", type=int, default=3000)
+    args = parser.parse_args()
+
+    batch = synthetic_detections(args.detections, args.objects)
+    records = batch.to_records()
+
+    start = time.perf_counter()
+    legacy = legacy_track_items(records)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = track_items(batch)
+    fast_s = time.perf_counter() - start
+
+    same = legacy == fast
+    print(f"{len(batch)} detections → {len(fast)} items")
+    print(f"legacy     {legacy_s:8.3f}s")
+    print(f"vectorized {fast_s:8.3f}s  ({legacy_s / fast_s:.1f}x)")
+    print("clusters identical" if same else "CLUSTERS DIFFER")
+
+    crowd = synthetic_detections(args.detections, args.crowd, n_classes=1)
+
+    start = time.perf_counter()
+    dense = _cluster_greedy(crowd.bbox, 0.5, grid_min_clusters=len(crowd) + 1)
+    dense_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    gridded = _cluster_greedy(crowd.bbox, 0.5)
+    grid_s = time.perf_counter() - start
+
+    crowd_same = bool((dense == gridded).all())
+    print(f"\ncrowd: {len(crowd)} detections → {dense.max() + 1} clusters")
+    print(f"dense      {dense_s:8.3f}s")
+    print(f"grid       {grid_s:8.3f}s  ({dense_s / grid_s:.1f}x)")
+    print("clusters identical" if crowd_same else "CLUSTERS DIFFER")
+
+    if not (same and crowd_same):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
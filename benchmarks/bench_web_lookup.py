@@ -0,0 +1,76 @@
+"""
+Web price lookup benchmark.
+
+Prices a video's worth of synthetic items against the local stub
+server (see stub_price_server.py) and compares one-at-a-time lookups
+with the concurrent client, the concurrent client against a flaky
+server (retries), and a re-run served from the TTL response cache.
+
+    python -m benchmarks.bench_web_lookup [--items 100] [--concurrency 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.stub_price_server import StubServer
+from src.enrichment.web_lookup import lookup_prices
+
+
+def synthetic_items(n: int) -> List[Dict]:
+    colours = ["black", "white", "gold", "silver", "brown"]
+    classes = ["watch", "handbag", "shoe", "necklace", "ring", "bracelet", "tie"]
+    return [
+        {
+            "id": i,
+            "item": classes[i % len(classes)],
+            "attributes": {"colour": {"label": f"{colours[i % len(colours)]}-{i}"}},
+        }
+        for i in range(n)
+    ]
+
+
+def run(label: str, stub: StubServer, items: List[Dict], **client_kwargs) -> None:
+    before = stub.requests
+    start = time.perf_counter()
+    results = lookup_prices(items, endpoint=stub.url, api_key="stub", **client_kwargs)
+    elapsed = time.perf_counter() - start
+
+    found = sum(r is not None for r in results)
+    print(
+        f"{label:<22} {elapsed:7.2f}s  "
+        f"{stub.requests - before:4d} requests  {found}/{len(items)} priced"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    items = synthetic_items(args.items)
+    pooled = {"concurrency": args.concurrency, "host_rps": 0, "timeout": 5.0}
+    uncached = {**pooled, "cache_ttl": 0}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cached = {**pooled, "cache_ttl": 3600, "cache_dir": Path(tmp)}
+
+        with StubServer(latency=args.latency) as stub:
+            run("sequential", stub, items, **{**uncached, "concurrency": 1})
+            run("concurrent", stub, items, **uncached)
+            run("concurrent, cold cache", stub, items, **cached)
+            run("concurrent, warm cache", stub, items, **cached)
+
+        with StubServer(latency=args.latency, fail_rate=args.fail_rate) as flaky:
+            run(f"flaky ({args.fail_rate:.0%} 503s)", flaky, items, **uncached)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Detector backend parity check.
+
+Runs the torch backend and another backend on frames already in
+data/frames/ and compares their boxes class by class.
+
+    python -m benchmarks.detector_parity --backend onnx [--limit 64]
+
+Exits non-zero when the backends disagree beyond the given tolerances.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+import cv2
+
+from src.config.paths import FRAMES_DIR
+from src.detection.detection_batch import DetectionBatch
+from src.detection.item_tracker import _iou
+from src.detection.object_detector import FashionObjectDetector
+from src.processing.frame_store import FrameRef, FrameStore
+
+Key = Tuple[FrameRef, str]
+
+
+def load_frames(
+    limit: int,
+    frames_dir: Path = FRAMES_DIR,
+    video: Optional[str] = None,
+    exclude_videos: AbstractSet[str] = frozenset(),
+    exclude_digests: AbstractSet[str] = frozenset(),
+) -> Tuple[List[FrameRef], FrameStore]:
+    """
+    Up to `limit` frames from <frames_dir>/<video_id>/*.jpg. Filters
+    (one video, excluded videos, excluded file hashes) apply before
+    the limit.
+    """
+    paths = [
+        p
+        for p in sorted(frames_dir.glob("*/*.jpg"))
+        if (video is None or p.parent.name == video)
+        and p.parent.name not in exclude_videos
+    ]
+    if exclude_digests:
+        paths = [
+            p
+            for p in paths
+            if hashlib.sha256(p.read_bytes()).hexdigest() not in exclude_digests
+        ]
+    paths = paths[:limit]
+    store = FrameStore(capacity=max(1, len(paths)), persist=False)
+
+    refs: List[FrameRef] = []
+    for i, path in enumerate(paths):
+        image = cv2.imread(str(path))
+        if image is not None:
+            refs.append(store.put(path.parent.name, i, image))
+
+    return refs, store
+
+
+def _group(batch: DetectionBatch) -> Dict[Key, List[Dict]]:
+    grouped: Dict[Key, List[Dict]] = defaultdict(list)
+    for det in batch.to_records():
+        grouped[(det["frame"], det["item"])].append(det)
+    return grouped
+
+
+def compare(
+    reference: DetectionBatch,
+    candidate: DetectionBatch,
+    iou_match: float = 0.5,
+) -> Dict[str, float]:
+    ref_groups = _group(reference)
+    cand_groups = _group(candidate)
+
+    matched = 0
+    ious: List[float] = []
+    conf_deltas: List[float] = []
+
+    for key, ref_dets in ref_groups.items():
+        pool = list(cand_groups.get(key, []))
+        for det in sorted(ref_dets, key=lambda d: -d["confidence"]):
+            if not pool:
+                break
+            scores = [_iou(det["bbox"], c["bbox"]) for c in pool]
+            best = max(range(len(pool)), key=lambda i: scores[i])
+            if scores[best] >= iou_match:
+                matched += 1
+                ious.append(scores[best])
+                conf_deltas.append(abs(det["confidence"] - pool[best]["confidence"]))
+                pool.pop(best)
+
+    n_ref = len(reference)
+    n_cand = len(candidate)
+
+    return {
+        "reference_boxes": n_ref,
+        "candidate_boxes": n_cand,
+        "recall": matched / n_ref if n_ref else 1.0,
+        "precision": matched / n_cand if n_cand else 1.0,
+        "mean_iou": sum(ious) / len(ious) if ious else 1.0,
+        "max_conf_delta": max(conf_deltas) if conf_deltas else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", default="onnx")
+    parser.add_argument("--limit", type=int, default=64)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    args = parser.parse_args()
+
+    refs, store = load_frames(args.limit)
+    if not refs:
+        print(f"No frames found under {FRAMES_DIR}")
+        sys.exit(1)
+
+    results = {}
+    for backend in ("torch", args.backend):
+        detector = FashionObjectDetector(backend=backend)
+        start = time.perf_counter()
+        results[backend] = detector.detect(refs, store)
+        elapsed = time.perf_counter() - start
+        print(f"{backend:<10} {len(refs) / elapsed:8.1f} frames/sec")
+
+    report = compare(results["torch"], results[args.backend])
+    for key, value in report.items():
+        print(f"{key:<16} {value:.4f}" if isinstance(value, float) else f"{key:<16} {value}")
+
+    ok = report["recall"] >= args.min_recall and report["mean_iou"] >= args.min_iou
+    print("PARITY OK" if ok else "PARITY FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
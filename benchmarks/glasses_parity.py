@@ -0,0 +1,99 @@
+"""
+Glasses scoring parity check.
+
+Scores face crops with the legacy recipe (softmax over raw CLIP dot
+products, one image per forward pass) and with the attribute engine
+(batched, glasses set on raw logits). Reports label agreement at
+GLASSES_THRESHOLD and the threshold on the engine's P(glasses) that
+best reproduces the legacy labels. Run it after touching the glasses
+prompt set or its scoring.
+
+    python -m benchmarks.glasses_parity [--faces data/faces] [--limit 500]
+
+Exits non-zero when agreement at the configured threshold is below
+--min-agreement; set GLASSES_THRESHOLD to the suggested value then.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, cast
+
+import numpy as np
+
+from src.classification.attribute_engine import (
+    FACE,
+    GLASSES,
+    encode_images,
+    get_attribute_engine,
+    load_rgb,
+)
+from src.classification.clip_model import get_clip
+from src.classification.glasses_classifier import glasses_probability
+from src.config.paths import FACE_DIR
+from src.config.settings import GLASSES_THRESHOLD
+
+
+def legacy_scores(paths: List[Path]) -> np.ndarray:
+    """
+    P(glasses) exactly as the pre-cache classifier computed it.
+    """
+    import clip
+    import torch
+
+    model, preprocess, device = get_clip()
+
+    with torch.no_grad():
+        text_features = model.encode_text(clip.tokenize(GLASSES.prompts).to(device))
+
+        scores = []
+        for path in paths:
+            image = cast(torch.Tensor, preprocess(load_rgb(path))).unsqueeze(0)
+            image_features = model.encode_image(image.to(device))
+            probs = (image_features @ text_features.T).softmax(dim=-1)[0].cpu().tolist()
+            scores.append(probs[0] + probs[1])  # both "wearing" prompts
+
+    return np.array(scores)
+
+
+def current_scores(paths: List[Path]) -> np.ndarray:
+    features = encode_images(paths, use_cache=False, normalize=False)
+    attrs = get_attribute_engine().score(features, [FACE] * len(paths))
+    return np.array([glasses_probability(a["glasses"]) for a in attrs])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--faces", type=Path, default=FACE_DIR)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+
+    paths = sorted(args.faces.rglob("*.jpg"))[: args.limit]
+    if not paths:
+        print(f"No face crops found under {args.faces}")
+        sys.exit(1)
+
+    legacy = legacy_scores(paths) > 0.5
+    current = current_scores(paths)
+
+    agreement = float(np.mean((current > GLASSES_THRESHOLD) == legacy))
+
+    thresholds = np.linspace(0.05, 0.95, 91)
+    agreements = np.array([np.mean((current > t) == legacy) for t in thresholds])
+    top = np.flatnonzero(agreements == agreements.max())
+    best = thresholds[top[np.argmin(np.abs(thresholds[top] - 0.5))]]  # nearest 0.5
+
+    print(f"{len(paths)} faces, legacy glasses rate {legacy.mean():.3f}")
+    print(f"agreement at GLASSES_THRESHOLD={GLASSES_THRESHOLD:.2f}: {agreement:.3f}")
+    print(f"best threshold {best:.2f}: agreement {agreements.max():.3f}")
+
+    ok = agreement >= args.min_agreement
+    print("PARITY OK" if ok else f"PARITY FAILED — try GLASSES_THRESHOLD={best:.2f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
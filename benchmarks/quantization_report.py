@@ -0,0 +1,114 @@
+"""
+INT8 vs FP32 detection report.
+
+Runs the FP32 and INT8 ONNX detectors on evaluation frames
+(<frames-dir>/<video_id>/*.jpg, default data/frames/, written with
+PERSIST_FRAMES=true) and reports per-class recall of INT8 against FP32
+(IoU >= 0.5, same class) for DETECTION_CLASSES, plus frames/sec for both.
+
+    python -m benchmarks.quantization_report [--limit 256] [--video VIDEO_ID]
+
+INT8 calibrates on YOLO_INT8_CALIBRATION_DIR only. Videos that appear
+there (as <video_id>/ folders) and images identical to a calibration
+image are excluded from evaluation, so the numbers are held-out.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.detector_parity import compare, load_frames
+from src.config.paths import FRAMES_DIR, REPORTS_DIR
+from src.config.settings import DETECTION_CLASSES, YOLO_INT8_CALIBRATION_DIR
+from src.detection.detection_batch import DetectionBatch
+from src.detection.object_detector import FashionObjectDetector
+from src.detection.quantization import calibration_images
+
+
+def _by_class(batch: DetectionBatch) -> Dict[str, DetectionBatch]:
+    names = batch.item_names()
+    indices: Dict[str, List[int]] = defaultdict(list)
+    for i, name in enumerate(names):
+        indices[name].append(i)
+    return {name: batch.select(idx) for name, idx in indices.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=256)
+    parser.add_argument("--frames-dir", type=Path, default=FRAMES_DIR)
+    parser.add_argument("--video", default=None, help="only use <frames-dir>/<video>")
+    args = parser.parse_args()
+
+    calibration = calibration_images(YOLO_INT8_CALIBRATION_DIR)
+    if not calibration:
+        raise SystemExit(f"No calibration images under {YOLO_INT8_CALIBRATION_DIR}")
+
+    refs, store = load_frames(
+        args.limit,
+        frames_dir=args.frames_dir,
+        video=args.video,
+        exclude_videos={p.parent.name for p in calibration},
+        exclude_digests={hashlib.sha256(p.read_bytes()).hexdigest() for p in calibration},
+    )
+    if not refs:
+        raise SystemExit(f"No held-out frames to evaluate under {args.frames_dir}")
+
+    runs: Dict[str, DetectionBatch] = {}
+    fps: Dict[str, float] = {}
+
+    for label, int8 in (("fp32", False), ("int8", True)):
+        detector = FashionObjectDetector(backend="onnx", int8=int8)
+        detector.detect(refs[:1], store)  # warm-up
+        start = time.perf_counter()
+        runs[label] = detector.detect(refs, store)
+        fps[label] = len(refs) / (time.perf_counter() - start)
+
+    fp32 = _by_class(runs["fp32"])
+    int8 = _by_class(runs["int8"])
+
+    per_class: Dict[str, Dict[str, Optional[float]]] = {}
+    for name in DETECTION_CLASSES:
+        ref = fp32.get(name, DetectionBatch.empty())
+        cand = int8.get(name, DetectionBatch.empty())
+        stats = compare(ref, cand)
+        per_class[name] = {
+            "fp32_boxes": stats["reference_boxes"],
+            "int8_boxes": stats["candidate_boxes"],
+            "recall_vs_fp32": stats["recall"] if len(ref) else None,
+            "mean_iou": stats["mean_iou"] if len(ref) else None,
+        }
+
+    overall = compare(runs["fp32"], runs["int8"])
+    report = {
+        "frames": len(refs),
+        "calibration_images": len(calibration),
+        "fps": fps,
+        "speedup": fps["int8"] / fps["fp32"],
+        "overall_recall_vs_fp32": overall["recall"],
+        "per_class": per_class,
+    }
+
+    print(f"{'class':<10}{'fp32':>6}{'int8':>6}{'recall':>9}{'iou':>7}")
+    for name, row in per_class.items():
+        recall = "-" if row["recall_vs_fp32"] is None else f"{row['recall_vs_fp32']:.3f}"
+        iou = "-" if row["mean_iou"] is None else f"{row['mean_iou']:.3f}"
+        print(f"{name:<10}{row['fp32_boxes']:>6}{row['int8_boxes']:>6}{recall:>9}{iou:>7}")
+    print(
+        f"fp32 {fps['fp32']:.1f} fps | int8 {fps['int8']:.1f} fps "
+        f"| speedup {report['speedup']:.2f}x"
+    )
+
+    out_path = REPORTS_DIR / "quantization_report.json"
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Report → {out_path}")
+
+
+if __name__ == "__main__":
+    main()
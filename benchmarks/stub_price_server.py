@@ -0,0 +1,148 @@
+"""
+Local stand-in for the Bing image-search endpoint.
+
+Answers GET /v7.0/images/search with deterministic, query-seeded
+offer prices in the Bing response shape, after an artificial latency,
+and fails a configurable fraction of requests with 503 so client
+retries can be exercised. No network access or API key needed.
+
+    python -m benchmarks.stub_price_server [--port 8765] [--fail-rate 0.1]
+
+then point the pipeline at it:
+
+    BING_SEARCH_ENDPOINT=http://127.0.0.1:8765/v7.0/images/search
+    BING_SEARCH_API_KEY=stub
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+from typing import Any, Optional
+
+from aiohttp import web
+
+SEARCH_PATH = "/v7.0/images/search"
+
+
+def make_app(
+    latency: float = 0.2,
+    fail_rate: float = 0.0,
+    seed: int = 0,
+) -> web.Application:
+    rng = random.Random(seed)
+    app = web.Application()
+    app["requests"] = 0
+
+    async def search(request: web.Request) -> web.Response:
+        app["requests"] += 1
+        await asyncio.sleep(latency)
+
+        if rng.random() < fail_rate:
+            return web.json_response({"error": "unavailable"}, status=503)
+
+        query = request.query.get("q", "")
+        count = int(request.query.get("count", "20"))
+
+        digest = int(hashlib.sha1(query.encode("utf-8")).hexdigest()[:8], 16)
+        base = 50 + digest % 5000
+
+        return web.json_response(
+            {
+                "value": [
+                    {
+                        "name": f"{query} #{i}",
+                        "insightsMetadata": {
+                            "aggregateOffer": {
+                                "lowPrice": round(base * (1 + 0.05 * i), 2),
+                                "highPrice": round(base * (1.4 + 0.05 * i), 2),
+                                "offerCount": 3,
+                            }
+                        },
+                    }
+                    for i in range(count)
+                ]
+            }
+        )
+
+    app.router.add_get(SEARCH_PATH, search)
+    return app
+
+
+class StubServer:
+    """
+    Runs the stub on its own event loop in a background thread, so sync
+    code (e.g. `lookup_prices`) can call it.
+
+        with StubServer(latency=0.1) as stub:
+            lookup_prices(items, endpoint=stub.url, api_key="stub")
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        **app_kwargs: Any,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.app = make_app(**app_kwargs)
+        self.url = ""
+
+        self._ready = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = threading.Thread(
+            target=self._serve, name="stub-price-server", daemon=True
+        )
+
+    @property
+    def requests(self) -> int:
+        return self.app["requests"]
+
+    def _serve(self) -> None:
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        runner = web.AppRunner(self.app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, self.host, self.port).start())
+
+        port = runner.addresses[0][1]
+        self.url = f"http://{self.host}:{port}{SEARCH_PATH}"
+        self._ready.set()
+
+        loop.run_forever()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        assert self._loop is not None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    web.run_app(
+        make_app(latency=args.latency, fail_rate=args.fail_rate),
+        host=args.host,
+        port=args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
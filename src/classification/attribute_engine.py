@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple, Union, cast
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.classification.clip_model import get_clip
+from src.classification.embedding_cache import VECTOR_DTYPE, get_embedding_cache
+from src.config.settings import (
+    CLIP_BATCH_SIZE,
+    CLIP_MODEL_NAME,
+    ENABLE_EMBEDDING_CACHE,
+    NON_PRODUCT_CLASSES,
+)
+from src.crops.crop_archive import CropRef, load_crop
+from src.utils.hashing import frame_digest
+from src.utils.logger import get_logger
+
+log = get_logger("attribute-engine")
+
+ImageInput = Union[CropRef, np.ndarray]  # file, PackedCrop or BGR array
+
+FACE = "face"  # kind for face crops (vs. detector class names)
+
+NON_ITEM_KINDS = frozenset([FACE, *NON_PRODUCT_CLASSES])
+
+
+# --------------------------------------------------
+# PROMPT SETS
+# --------------------------------------------------
+
+
+@dataclass(frozen=True)
+class PromptSet:
+    """
+    One zero-shot attribute: each label has one or more prompts whose
+    probabilities are summed. `kinds` limits the set to some crop kinds
+    (detector class names or FACE); None applies it to every product
+    crop (not faces or NON_PRODUCT_CLASSES such as "person").
+
+    `raw_logits` softmaxes raw (un-normalized) feature dot products, the
+    original glasses recipe, instead of logit_scale × cosine.
+    """
+
+    name: str
+    labels: Tuple[Tuple[str, Tuple[str, ...]], ...]
+    kinds: Optional[FrozenSet[str]] = None
+    raw_logits: bool = False
+
+    @property
+    def prompts(self) -> List[str]:
+        return [p for _, prompts in self.labels for p in prompts]
+
+    def applies_to(self, kind: str) -> bool:
+        if self.kinds is None:
+            return kind not in NON_ITEM_KINDS
+        return kind in self.kinds
+
+
+def prompt_set(
+    name: str,
+    labels: Dict[str, Sequence[str]],
+    kinds: Optional[Sequence[str]] = None,
+    raw_logits: bool = False,
+) -> PromptSet:
+    return PromptSet(
+        name=name,
+        labels=tuple((label, tuple(prompts)) for label, prompts in labels.items()),
+        kinds=frozenset(kinds) if kinds is not None else None,
+        raw_logits=raw_logits,
+    )
+
+
+GLASSES = prompt_set(
+    "glasses",
+    {
+        "glasses": ["a person wearing glasses", "a person wearing sunglasses"],
+        "no_glasses": ["a person without glasses"],
+    },
+    kinds=[FACE],
+    raw_logits=True,  # keeps the legacy P(glasses), so GLASSES_THRESHOLD=0.5 holds
+)
+
+COLOUR = prompt_set(
+    "colour",
+    {
+        colour: [f"a photo of a {colour} fashion item"]
+        for colour in [
+            "black", "white", "grey", "brown", "beige", "red",
+            "pink", "blue", "green", "yellow", "gold", "silver",
+        ]
+    },
+)
+
+MATERIAL = prompt_set(
+    "material",
+    {
+        "leather": ["a photo of a leather item"],
+        "metal": ["a photo of a metal item"],
+        "fabric": ["a photo of a fabric item"],
+        "denim": ["a photo of a denim item"],
+        "canvas": ["a photo of a canvas item"],
+        "plastic": ["a photo of a plastic item"],
+    },
+)
+
+STRAP = prompt_set(
+    "strap",
+    {
+        "metal": ["a watch with a metal bracelet"],
+        "leather": ["a watch with a leather strap"],
+        "rubber": ["a watch with a rubber strap"],
+    },
+    kinds=["watch"],
+)
+
+LOGO = prompt_set(
+    "logo",
+    {
+        "visible": ["a product with a visible brand logo"],
+        "none": ["a plain product without a logo"],
+    },
+    kinds=["handbag", "backpack", "shoe", "tie", "watch"],
+)
+
+DEFAULT_PROMPT_SETS: Tuple[PromptSet, ...] = (GLASSES, COLOUR, MATERIAL, STRAP, LOGO)
+
+
+# --------------------------------------------------
+# ENCODING
+# --------------------------------------------------
+
+
+def load_bgr(image_ref: ImageInput) -> np.ndarray:
+    if isinstance(image_ref, np.ndarray):
+        return image_ref
+    bgr = load_crop(image_ref)
+    if bgr is None:
+        raise FileNotFoundError(str(image_ref))
+    return bgr
+
+
+def load_rgb(image_ref: ImageInput) -> Image.Image:
+    return Image.fromarray(cv2.cvtColor(load_bgr(image_ref), cv2.COLOR_BGR2RGB))
+
+
+def _normalize(features: np.ndarray) -> np.ndarray:
+    return features / np.linalg.norm(features, axis=-1, keepdims=True)
+
+
+@lru_cache(maxsize=None)
+def text_features(prompts: Tuple[str, ...]) -> np.ndarray:
+    """
+    Raw (un-normalized) text embeddings for `prompts` (float32),
+    computed once for the process-wide CLIP model.
+    """
+    import clip
+    import torch
+
+    model, _, device = get_clip()
+
+    with torch.no_grad():
+        features = model.encode_text(clip.tokenize(list(prompts)).to(device))
+
+    return features.float().cpu().numpy()
+
+
+def _encode_batch(images: Sequence[ImageInput], batch_size: int) -> np.ndarray:
+    """
+    Raw image features; images are decoded one batch at a time.
+    """
+    import torch
+
+    model, preprocess, device = get_clip()
+
+    chunks = []
+    for start in range(0, len(images), batch_size):
+        batch = torch.stack(
+            [
+                cast(torch.Tensor, preprocess(load_rgb(img)))
+                for img in images[start : start + batch_size]
+            ]
+        ).to(device)
+
+        with torch.no_grad():
+            chunks.append(model.encode_image(batch).float().cpu().numpy())
+
+    return np.concatenate(chunks)
+
+
+def encode_images(
+    images: Sequence[ImageInput],
+    batch_size: int = CLIP_BATCH_SIZE,
+    use_cache: bool = ENABLE_EMBEDDING_CACHE,
+    normalize: bool = True,
+) -> np.ndarray:
+    """
+    Image embeddings (N, D) float32, L2-normalized unless `normalize`
+    is off (the attribute engine needs the raw ones). Images are
+    decoded `batch_size` at a time, never all up front.
+
+    With the embedding cache, crops are keyed by pixel content and only
+    cache misses go through the image encoder (batched). Fresh vectors
+    are rounded through the cache's float16, so a first run and a cached
+    re-run score identically.
+    """
+    if not use_cache:
+        features = _encode_batch(images, batch_size)
+        return _normalize(features) if normalize else features
+
+    cache = get_embedding_cache(CLIP_MODEL_NAME)
+
+    chunks: List[np.ndarray] = []
+    encoded = 0
+    for start in range(0, len(images), batch_size):
+        arrays = [load_bgr(img) for img in images[start : start + batch_size]]
+        keys = [frame_digest(a) for a in arrays]
+        cached = cache.get_many(keys)
+
+        missing = [i for i, vec in enumerate(cached) if vec is None]
+        if missing:
+            fresh = _encode_batch([arrays[i] for i in missing], batch_size)
+            fresh = fresh.astype(VECTOR_DTYPE).astype(np.float32)
+            cache.put_many([keys[i] for i in missing], fresh)
+            for i, vec in zip(missing, fresh):
+                cached[i] = vec
+
+        chunks.append(np.stack(cached).astype(np.float32))
+        encoded += len(missing)
+
+    log.info(f"Embeddings: {len(images) - encoded} cached, {encoded} encoded")
+
+    features = np.concatenate(chunks)
+    return _normalize(features) if normalize else features
+
+
+# --------------------------------------------------
+# ENGINE
+# --------------------------------------------------
+
+
+class AttributeEngine:
+    """
+    Zero-shot attributes from a single image embedding per crop.
+
+    All prompt sets are stacked into one cached text matrix, so scoring
+    N crops against every attribute is one (N × D) @ (D × prompts)
+    multiply (two when a set uses raw logits); each set is then
+    softmaxed over its own column slice.
+
+    Scores are unrounded probabilities; round for display only.
+    """
+
+    def __init__(self, prompt_sets: Sequence[PromptSet] = DEFAULT_PROMPT_SETS) -> None:
+        self.prompt_sets = tuple(prompt_sets)
+
+        self._prompts: List[str] = []
+        self._slices: Dict[str, Tuple[int, int]] = {}
+        for ps in self.prompt_sets:
+            start = len(self._prompts)
+            self._prompts.extend(ps.prompts)
+            self._slices[ps.name] = (start, len(self._prompts))
+
+    def score(
+        self,
+        image_features: np.ndarray,
+        kinds: Sequence[str],
+    ) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Attributes for pre-computed raw image embeddings
+        (encode_images(..., normalize=False)).
+        """
+        if not len(kinds):
+            return []
+
+        model, _, _ = get_clip()
+        scale = float(model.logit_scale.exp())
+
+        text = text_features(tuple(self._prompts))
+        raw = image_features @ text.T
+        logits = scale * _normalize(image_features) @ _normalize(text).T
+
+        results: List[Dict[str, Dict[str, Any]]] = []
+        for row, raw_row, kind in zip(logits, raw, kinds):
+            attrs: Dict[str, Dict[str, Any]] = {}
+            for ps in self.prompt_sets:
+                if not ps.applies_to(kind):
+                    continue
+
+                start, end = self._slices[ps.name]
+                z = (raw_row if ps.raw_logits else row)[start:end]
+                z = z - z.max()
+                probs = np.exp(z) / np.exp(z).sum()
+
+                scores: Dict[str, float] = {}
+                pos = 0
+                for label, prompts in ps.labels:
+                    scores[label] = float(probs[pos : pos + len(prompts)].sum())
+                    pos += len(prompts)
+
+                best = max(scores, key=scores.__getitem__)
+                attrs[ps.name] = {"label": best, "score": scores[best]}
+
+            results.append(attrs)
+
+        return results
+
+    def classify(
+        self,
+        images: Sequence[ImageInput],
+        kinds: Sequence[str],
+        batch_size: int = CLIP_BATCH_SIZE,
+    ) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Encode each image once, then return every applicable attribute:
+
+            [{"colour": {"label": "black", "score": 0.7132}, ...}, ...]
+        """
+        if not images:
+            return []
+
+        return self.score(encode_images(images, batch_size, normalize=False), kinds)
+
+
+def rounded(
+    attrs: Dict[str, Dict[str, Any]],
+    digits: int = 3,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Attributes with display-rounded scores (for item output).
+    """
+    return {
+        name: {**attr, "score": round(attr["score"], digits)}
+        for name, attr in attrs.items()
+    }
+
+
+_ENGINE: Optional[AttributeEngine] = None
+
+
+def get_attribute_engine() -> AttributeEngine:
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = AttributeEngine()
+    return _ENGINE
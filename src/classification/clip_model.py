@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+from src.config.settings import CLIP_MODEL_NAME
+from src.utils.logger import get_logger
+
+log = get_logger("clip-model")
+
+
+# --------------------------------------------------
+# PROCESS-WIDE HANDLE
+# --------------------------------------------------
+
+_LOCK = threading.Lock()
+_HANDLE: Optional[Tuple[Any, Callable, str]] = None
+_WARMUP: Optional[threading.Thread] = None
+
+
+def get_clip() -> Tuple[Any, Callable, str]:
+    """
+    (model, preprocess, device), loaded on first use and shared by
+    every caller in the process. torch / clip are imported here too,
+    so processes that never classify never pay for them.
+    """
+    global _HANDLE
+
+    if _HANDLE is not None:
+        return _HANDLE
+
+    with _LOCK:
+        if _HANDLE is None:
+            import clip
+            import torch
+
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            log.info(f"Loading CLIP {CLIP_MODEL_NAME} on {device}")
+
+            model, preprocess = clip.load(CLIP_MODEL_NAME, device=device)
+            model.eval()
+
+            _HANDLE = (model, preprocess, device)
+
+    return _HANDLE
+
+
+def warm_up_clip() -> threading.Thread:
+    """
+    Start loading CLIP on a daemon thread (idempotent), so the load
+    overlaps the stages before classification. get_clip() simply blocks
+    on the same lock if it is called before the warm-up finishes.
+    """
+    global _WARMUP
+
+    with _LOCK:
+        if _WARMUP is None:
+            _WARMUP = threading.Thread(
+                target=_warm_up,
+                name="clip-warmup",
+                daemon=True,
+            )
+            _WARMUP.start()
+        return _WARMUP
+
+
+def _warm_up() -> None:
+    try:
+        get_clip()
+    except Exception as e:  # surfaced again on first real use
+        log.warning(f"CLIP warm-up failed: {e}")
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.config.paths import CACHE_DIR
+from src.utils.logger import get_logger
+
+log = get_logger("embedding-cache")
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+EMBEDDING_CACHE_DIR = CACHE_DIR / "embeddings"
+
+VECTOR_DTYPE = np.dtype("<f2")  # little-endian float16
+
+# what a row holds; older layouts are discarded on open
+FEATURES = "raw"  # un-normalized encoder output
+
+
+def _slug(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", model_name).strip("-")
+
+
+# --------------------------------------------------
+# CACHE
+# --------------------------------------------------
+
+
+class EmbeddingCache:
+    """
+    Persistent CLIP image-embedding cache, one namespace per model.
+
+    Layout under CACHE_DIR/embeddings/<model>/:
+        vectors.f16  (rows × dim) float16, append-only, memory-mapped
+        index.tsv    "content_hash<TAB>row" per line
+        meta.json    {"model": ..., "dim": ..., "features": "raw"}
+
+    Keys are content hashes of the decoded crop pixels, so re-runs and
+    re-uploads of the same clip under a new video id hit the cache.
+    Rows are only ever appended; the matrix is written before the index
+    line that points at it. One writer process per model namespace.
+    """
+
+    def __init__(self, model_name: str, root: Path = EMBEDDING_CACHE_DIR) -> None:
+        self.model_name = model_name
+        self.root = root / _slug(model_name)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._vectors = self.root / "vectors.f16"
+        self._index_file = self.root / "index.tsv"
+        self._meta = self.root / "meta.json"
+
+        self.dim: Optional[int] = None
+        if self._meta.exists():
+            meta = json.loads(self._meta.read_text(encoding="utf-8"))
+            if meta.get("features") == FEATURES:
+                self.dim = int(meta["dim"])
+            else:
+                log.warning(f"Discarding embedding cache with old layout: {self.root}")
+                for path in (self._vectors, self._index_file, self._meta):
+                    path.unlink(missing_ok=True)
+
+        self._index: Dict[str, int] = {}
+        self._rows = 0
+        self._matrix: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _row_bytes(self) -> int:
+        return VECTOR_DTYPE.itemsize * (self.dim or 0)
+
+    def _load_index(self) -> None:
+        if self.dim is None or not self._vectors.exists():
+            return
+
+        size = self._vectors.stat().st_size
+        self._rows = size // self._row_bytes()
+
+        if size % self._row_bytes():
+            # torn last row from an interrupted run: drop it so appended
+            # rows stay aligned with their index entries
+            log.warning(f"Truncating torn embedding cache tail: {self._vectors}")
+            with open(self._vectors, "r+b") as f:
+                f.truncate(self._rows * self._row_bytes())
+
+        if self._index_file.exists():
+            text = self._index_file.read_text(encoding="utf-8")
+            if text and not text.endswith("\n"):
+                # torn last line: cut it, or the next append would be
+                # glued onto it
+                text = text[: text.rfind("\n") + 1]
+                with open(self._index_file, "r+b") as f:
+                    f.truncate(len(text.encode("utf-8")))
+
+            for line in text.splitlines():
+                key, _, row = line.partition("\t")
+                if row.isdigit() and int(row) < self._rows:
+                    self._index[key] = int(row)
+
+    def _map(self) -> Optional[np.memmap]:
+        if self._rows == 0 or self.dim is None:
+            return None
+        if self._matrix is None or self._matrix.shape[0] < self._rows:
+            self._matrix = np.memmap(
+                self._vectors,
+                dtype=VECTOR_DTYPE,
+                mode="r",
+                shape=(self._rows, self.dim),
+            )
+        return self._matrix
+
+    # --------------------------------------------------
+    # API
+    # --------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        float32 vectors for cached keys, None for misses.
+        """
+        with self._lock:
+            matrix = self._map()
+            out: List[Optional[np.ndarray]] = []
+            for key in keys:
+                row = self._index.get(key)
+                if row is None or matrix is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self.hits += 1
+                    out.append(np.asarray(matrix[row], dtype=np.float32))
+            return out
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        if not len(keys):
+            return
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._meta.write_text(
+                    json.dumps(
+                        {"model": self.model_name, "dim": self.dim, "features": FEATURES}
+                    ),
+                    encoding="utf-8",
+                )
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dim {vectors.shape[1]} != cached dim {self.dim}"
+                )
+
+            fresh = [i for i, k in enumerate(keys) if k not in self._index]
+            if not fresh:
+                return
+
+            with open(self._vectors, "ab") as f:
+                f.write(vectors[fresh].astype(VECTOR_DTYPE).tobytes())
+
+            start = self._rows
+            lines = []
+            for offset, i in enumerate(fresh):
+                self._index[keys[i]] = start + offset
+                lines.append(f"{keys[i]}\t{start + offset}\n")
+
+            with open(self._index_file, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+
+            self._rows += len(fresh)
+
+
+_CACHES: Dict[str, EmbeddingCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """
+    Process-wide cache per model.
+    """
+    with _CACHES_LOCK:
+        cache = _CACHES.get(model_name)
+        if cache is None:
+            cache = _CACHES[model_name] = EmbeddingCache(model_name)
+        return cache
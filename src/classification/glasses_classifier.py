@@ -1,49 +1,59 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Literal
-
-import clip
-import torch
-from typing import cast
-
-from PIL import Image
-
+from typing import Any, Dict, List, Literal, Sequence
+
+from src.classification.attribute_engine import (
+    FACE,
+    ImageInput,
+    get_attribute_engine,
+)
+from src.config.settings import CLIP_BATCH_SIZE, GLASSES_THRESHOLD
 from src.utils.logger import get_logger
 
 log = get_logger("glasses-classifier")
 
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-
-MODEL, PREPROCESS = clip.load("ViT-B/32", device=DEVICE)
-
-TEXT_PROMPTS = [
-    "a person wearing glasses",
-    "a person wearing sunglasses",
-    "a person without glasses",
-]
+GlassesLabel = Literal["glasses", "no_glasses"]
 
 
-def classify_glasses(image_path: Path) -> Literal["glasses", "no_glasses"]:
-    img_tensor = PREPROCESS(Image.open(image_path).convert("RGB"))
-    img_tensor = cast(torch.Tensor, img_tensor)
+def glasses_probability(attr: Dict[str, Any]) -> float:
+    """
+    P(glasses) from the engine's {"label", "score"} for the glasses set
+    (unrounded; don't pass display-rounded attributes).
+    """
+    return attr["score"] if attr["label"] == "glasses" else 1.0 - attr["score"]
 
-    image = img_tensor.unsqueeze(0).to(DEVICE)
 
-    text = clip.tokenize(TEXT_PROMPTS).to(DEVICE)
+def glasses_label(
+    attr: Dict[str, Any],
+    threshold: float = GLASSES_THRESHOLD,
+) -> GlassesLabel:
+    return "glasses" if glasses_probability(attr) > threshold else "no_glasses"
 
-    with torch.no_grad():
-        image_features = MODEL.encode_image(image)
-        text_features = MODEL.encode_text(text)
 
-        logits = (image_features @ text_features.T).softmax(dim=-1)
-        probs = logits[0].cpu().tolist()
+def classify_glasses_batch(
+    images: Sequence[ImageInput],
+    batch_size: int = CLIP_BATCH_SIZE,
+) -> List[GlassesLabel]:
+    """
+    Classify many face crops with batched image-only forward passes
+    against the cached prompt embeddings. Results follow input order.
+    """
+    # glasses is the only prompt set of the shared engine that applies to faces
+    attrs = get_attribute_engine().classify(images, [FACE] * len(images), batch_size)
+    results: List[GlassesLabel] = [glasses_label(a["glasses"]) for a in attrs]
 
-    glasses_score = probs[0] + probs[1]
-    no_glasses_score = probs[2]
+    if results:
+        log.info(
+            f"Glasses detection → {results.count('glasses')} / "
+            f"{len(results)} faces with glasses"
+        )
 
-    result = "glasses" if glasses_score > no_glasses_score else "no_glasses"
+    return results
 
-    log.info(f"Glasses detection → {result} ({glasses_score:.2f})")
 
-    return result
+def classify_glasses(image_path: ImageInput) -> GlassesLabel:
+    """
+    `image_path` is a face crop file, a PackedCrop from a crop archive
+    or a BGR array.
+    """
+    return classify_glasses_batch([image_path])[0]
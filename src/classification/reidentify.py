@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+
+from src.classification.attribute_engine import encode_images
+from src.config.settings import NON_PRODUCT_CLASSES, REID_SIMILARITY_THRESHOLD
+from src.utils.logger import get_logger, log_section
+
+log = get_logger("reidentify")
+
+
+# --------------------------------------------------
+# GROUPING
+# --------------------------------------------------
+
+
+def _groups(embeddings: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Cluster label per row, by complete linkage: every pair inside a
+    group has cosine similarity >= `threshold` (embeddings are
+    L2-normalized), so A~B and B~C alone never merge A with C.
+    """
+    if len(embeddings) < 2:
+        return np.zeros(len(embeddings), dtype=np.int64)
+
+    distance = np.clip(1.0 - embeddings @ embeddings.T, 0.0, 2.0)
+    np.fill_diagonal(distance, 0.0)
+    tree = linkage(squareform(distance, checks=False), method="complete")
+    return fcluster(tree, t=1.0 - threshold, criterion="distance") - 1
+
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+
+def merge_duplicate_items(
+    items: List[Dict],
+    threshold: float = REID_SIMILARITY_THRESHOLD,
+) -> List[Dict]:
+    """
+    Merge accepted crops of the same class whose CLIP embeddings are
+    near-identical (e.g. one watch tracked twice from two camera angles).
+
+    Each merged group keeps its highest-confidence crop, sums
+    `frames_seen` and lists the absorbed ids under `merged_ids`.
+    Output keeps the order of each group's first item. Non-product
+    classes (people) are passed through unmerged.
+    """
+
+    log_section("Cross-Track Re-identification")
+
+    products = [i for i, item in enumerate(items) if item["item"] not in NON_PRODUCT_CLASSES]
+    if len(products) < 2:
+        return items
+
+    embeddings = encode_images(
+        [
+            items[i]["crop_image"] if items[i].get("crop_image") is not None
+            else items[i]["crop_path"]
+            for i in products
+        ]
+    )
+
+    # every item starts in its own group; products are then regrouped
+    group = np.arange(len(items), dtype=np.int64)
+    classes = np.array([items[i]["item"] for i in products])
+    rows = np.array(products)
+
+    offset = len(items)
+    for name in dict.fromkeys(classes.tolist()):
+        idx = np.flatnonzero(classes == name)
+        labels = _groups(embeddings[idx], threshold)
+        group[rows[idx]] = labels + offset
+        offset += int(labels.max()) + 1
+
+    merged: List[Dict] = []
+    for g in dict.fromkeys(group.tolist()):
+        members = [items[i] for i in np.flatnonzero(group == g)]
+        if len(members) == 1:
+            merged.append(members[0])
+            continue
+
+        best = max(members, key=lambda m: m["confidence"])
+        merged.append(
+            {
+                **best,
+                "frames_seen": sum(m["frames_seen"] for m in members),
+                "merged_ids": [m["id"] for m in members if m is not best],
+            }
+        )
+
+    log.info(f"Re-identified {len(items)} items → {len(merged)}")
+
+    return merged
@@ -57,6 +57,44 @@ MAX_VIDEO_DURATION_SEC = int(os.getenv("MAX_VIDEO_DURATION_SEC", "90"))
 FRAME_SAMPLE_RATE = int(os.getenv("FRAME_SAMPLE_RATE", "5"))  # every N frames
 MIN_VIDEO_RESOLUTION = int(os.getenv("MIN_VIDEO_RESOLUTION", "720"))
 
+# --------------------------------------------------
+# FRAME SAMPLING
+# --------------------------------------------------
+
+# read | grab | seek | ffmpeg
+FRAME_SAMPLER_BACKEND = os.getenv("FRAME_SAMPLER_BACKEND", "grab").lower()
+
+# seek backend: only seek when the next wanted frame is this far ahead
+FRAME_SEEK_MIN_GAP = int(os.getenv("FRAME_SEEK_MIN_GAP", "30"))
+
+# fixed → every FRAME_SAMPLE_RATE frames
+# adaptive → detect shots, spread FRAME_BUDGET frames across them
+FRAME_SAMPLING_MODE = os.getenv("FRAME_SAMPLING_MODE", "fixed").lower()
+FRAME_BUDGET = int(os.getenv("FRAME_BUDGET", "120"))  # frames per video
+
+# shot scan thumbnails per second of video (well below FRAME_SAMPLE_RATE)
+SHOT_SCAN_FPS = float(os.getenv("SHOT_SCAN_FPS", "3"))
+SHOT_CUT_THRESHOLD = float(os.getenv("SHOT_CUT_THRESHOLD", "0.35"))  # Bhattacharyya
+
+# --------------------------------------------------
+# NEAR-DUPLICATE FRAMES
+# --------------------------------------------------
+
+ENABLE_FRAME_DEDUP = os.getenv("ENABLE_FRAME_DEDUP", "false").lower() == "true"
+FRAME_DEDUP_HAMMING = int(os.getenv("FRAME_DEDUP_HAMMING", "6"))  # of 64 bits
+FRAME_DEDUP_WINDOW = int(os.getenv("FRAME_DEDUP_WINDOW", "4"))  # recent kept frames
+
+# --------------------------------------------------
+# FRAME STORE
+# --------------------------------------------------
+
+# max decoded frames kept in memory (LRU); videos with more kept
+# frames also spill them to FRAMES_DIR as JPEGs
+FRAME_STORE_CAPACITY = int(os.getenv("FRAME_STORE_CAPACITY", "256"))
+
+# also write sampled frames to FRAMES_DIR (debug / persistence sink)
+PERSIST_FRAMES = os.getenv("PERSIST_FRAMES", "false").lower() == "true"
+
 # --------------------------------------------------
 # DETECTION (YOLO)
 # --------------------------------------------------
@@ -70,6 +108,21 @@ YOLO_CONFIDENCE_THRESHOLD = float(os.getenv("YOLO_CONFIDENCE_THRESHOLD", "0.5"))
 
 YOLO_IOU_THRESHOLD = float(os.getenv("YOLO_IOU_THRESHOLD", "0.45"))
 
+YOLO_BATCH_SIZE = int(os.getenv("YOLO_BATCH_SIZE", "8"))  # frames per predict call
+
+YOLO_IMGSZ = int(os.getenv("YOLO_IMGSZ", "640"))
+
+# torch | onnx | openvino (exported once, cached under models/yolo/exports)
+YOLO_BACKEND = os.getenv("YOLO_BACKEND", "torch").lower()
+
+# opt-in post-training static INT8 (onnx backend), calibrated on the
+# images in YOLO_INT8_CALIBRATION_DIR (fill with: python -m src.detection.quantization)
+YOLO_INT8 = os.getenv("YOLO_INT8", "false").lower() == "true"
+YOLO_INT8_CALIBRATION_FRAMES = int(os.getenv("YOLO_INT8_CALIBRATION_FRAMES", "128"))
+YOLO_INT8_CALIBRATION_DIR = Path(
+    os.getenv("YOLO_INT8_CALIBRATION_DIR", str(DATA_DIR / "calibration"))
+)
+
 DETECTION_CLASSES = [
     "shoe",
     "watch",
@@ -82,6 +135,97 @@ DETECTION_CLASSES = [
     "tie",
 ]
 
+# detected classes that are not products (no attributes, no price lookup)
+NON_PRODUCT_CLASSES = ["person"]
+
+# single → one pass over full frames
+# cascade → low-res pass for people (+ large items), then accessory
+#           classes on upscaled person ROIs
+DETECTION_MODE = os.getenv("DETECTION_MODE", "single").lower()
+
+CASCADE_ROI_CLASSES = [
+    c.strip()
+    for c in os.getenv("CASCADE_ROI_CLASSES", "watch,necklace,ring,bracelet").split(",")
+    if c.strip()
+]
+CASCADE_PERSON_IMGSZ = int(os.getenv("CASCADE_PERSON_IMGSZ", "320"))
+CASCADE_ROI_IMGSZ = int(os.getenv("CASCADE_ROI_IMGSZ", "640"))
+CASCADE_ROI_PADDING = float(os.getenv("CASCADE_ROI_PADDING", "0.1"))
+
+# per-frame results in one pack per video file (by content) under
+# CACHE_DIR/detections, keyed by frame content + weights hash +
+# thresholds + class set
+ENABLE_DETECTION_CACHE = (
+    os.getenv("ENABLE_DETECTION_CACHE", "false").lower() == "true"
+)
+
+# --------------------------------------------------
+# ITEM TRACKING
+# --------------------------------------------------
+
+# iou → global greedy IoU dedup
+# sort → Kalman + Hungarian temporal tracker
+TRACKER_MODE = os.getenv("TRACKER_MODE", "iou").lower()
+TRACKER_IOU_THRESHOLD = float(os.getenv("TRACKER_IOU_THRESHOLD", "0.3"))
+TRACKER_MAX_AGE = int(os.getenv("TRACKER_MAX_AGE", "30"))  # source frames
+
+# crop / quality-check items as their tracks close, while detection
+# is still running (requires TRACKER_MODE=sort)
+PIPELINE_STREAMING = os.getenv("PIPELINE_STREAMING", "false").lower() == "true"
+
+# merge accepted crops of the same class whose CLIP embeddings are
+# near-identical (same item across camera angles / separate tracks)
+ENABLE_REID = os.getenv("ENABLE_REID", "false").lower() == "true"
+REID_SIMILARITY_THRESHOLD = float(os.getenv("REID_SIMILARITY_THRESHOLD", "0.92"))
+
+# --------------------------------------------------
+# CROP QUALITY
+# --------------------------------------------------
+
+# threads for crop / face / quality work (OpenCV releases the GIL)
+# 0 → min(4, CPU cores): OpenCV already threads some calls internally,
+# so one pool thread per core would oversubscribe; 1 → sequential
+CROP_WORKERS = int(os.getenv("CROP_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+# downscale crops whose longest side exceeds this before scoring
+# (0 → score at full resolution; thresholds were tuned there)
+QUALITY_MAX_SIDE = int(os.getenv("QUALITY_MAX_SIDE", "0"))
+
+# files → one JPEG per crop (CROPS_DIR/<video>/, FACE_DIR)
+# packed → one append-only CROPS_DIR/<video>.pack + .idx per video
+CROP_STORAGE = os.getenv("CROP_STORAGE", "files").lower()
+
+# debug: also write crops that fail the quality check (CROPS_DIR/<video>/rejected)
+SAVE_REJECTED_CROPS = os.getenv("SAVE_REJECTED_CROPS", "false").lower() == "true"
+
+# --------------------------------------------------
+# CLASSIFICATION (CLIP)
+# --------------------------------------------------
+
+CLIP_MODEL_NAME = os.getenv("CLIP_MODEL_NAME", "ViT-B/32")
+CLIP_BATCH_SIZE = int(os.getenv("CLIP_BATCH_SIZE", "32"))  # images per forward pass
+
+# P(glasses) above which a face counts as wearing glasses. The glasses
+# set keeps the legacy raw-dot softmax, so 0.5 is the legacy argmax;
+# check with benchmarks/glasses_parity.py
+GLASSES_THRESHOLD = float(os.getenv("GLASSES_THRESHOLD", "0.5"))
+
+# float16 image embeddings under CACHE_DIR/embeddings/<model>, keyed by
+# crop pixel hash — re-runs / re-uploads skip the image encoder (opt-in)
+ENABLE_EMBEDDING_CACHE = (
+    os.getenv("ENABLE_EMBEDDING_CACHE", "false").lower() == "true"
+)
+
+# zero-shot colour / material / strap / logo on product crops; off by
+# default since it CLIP-encodes every accepted crop
+# (faces always get the glasses prompt set)
+ENABLE_ATTRIBUTES = os.getenv("ENABLE_ATTRIBUTES", "false").lower() == "true"
+
+# start loading CLIP on a background thread at the first detection that
+# needs it (person / attributes), overlapping tracking and cropping
+# (otherwise it loads on first use)
+CLIP_WARMUP = os.getenv("CLIP_WARMUP", "false").lower() == "true"
+
 # --------------------------------------------------
 # BRAND & PRICE ESTIMATION
 # --------------------------------------------------
@@ -92,6 +236,20 @@ DEFAULT_PRICE_RANGE = "$500 – $5,000"
 
 ENABLE_WEB_LOOKUP = os.getenv("ENABLE_WEB_LOOKUP", "false").lower() == "true"
 
+# heuristic → detection-confidence rules (BRAND_RULES)
+# catalog → nearest neighbours in a local reference catalog index
+PRICE_ESTIMATION_MODE = os.getenv("PRICE_ESTIMATION_MODE", "heuristic").lower()
+
+CATALOG_PATH = Path(
+    os.getenv("CATALOG_PATH", str(DATA_DIR / "catalog" / "catalog.jsonl"))
+)
+CATALOG_INDEX_DIR = Path(
+    os.getenv("CATALOG_INDEX_DIR", str(DATA_DIR / "catalog" / "index"))
+)
+CATALOG_TOP_K = int(os.getenv("CATALOG_TOP_K", "5"))
+CATALOG_NPROBE = int(os.getenv("CATALOG_NPROBE", "16"))  # IVF cells per query
+CATALOG_FLAT_MAX = int(os.getenv("CATALOG_FLAT_MAX", "50000"))  # brute force up to
+
 # --------------------------------------------------
 # SEARCH / APIs (OPTIONAL)
 # --------------------------------------------------
@@ -102,6 +260,15 @@ BING_SEARCH_ENDPOINT = os.getenv(
     "https://api.bing.microsoft.com/v7.0/images/search",
 )
 
+# async client: pooled session, shared by all lookups of one video
+WEB_LOOKUP_CONCURRENCY = int(os.getenv("WEB_LOOKUP_CONCURRENCY", "8"))
+WEB_LOOKUP_HOST_RPS = float(os.getenv("WEB_LOOKUP_HOST_RPS", "3"))  # 0 = unlimited
+WEB_LOOKUP_TIMEOUT = float(os.getenv("WEB_LOOKUP_TIMEOUT", "10"))  # seconds
+WEB_LOOKUP_RETRIES = int(os.getenv("WEB_LOOKUP_RETRIES", "2"))
+
+# responses cached under CACHE_DIR/web_lookup (0 disables)
+WEB_LOOKUP_CACHE_TTL = int(os.getenv("WEB_LOOKUP_CACHE_TTL", str(24 * 3600)))
+
 # --------------------------------------------------
 # RENDERING
 # --------------------------------------------------
@@ -125,6 +292,34 @@ def validate_settings() -> None:
     if not YOLO_MODEL_PATH:
         raise RuntimeError("YOLO_MODEL_PATH is not set")
 
+    if FRAME_SAMPLER_BACKEND not in {"read", "grab", "seek", "ffmpeg"}:
+        raise RuntimeError(
+            f"Unknown FRAME_SAMPLER_BACKEND: {FRAME_SAMPLER_BACKEND}"
+        )
+
+    if YOLO_BACKEND not in {"torch", "onnx", "openvino"}:
+        raise RuntimeError(f"Unknown YOLO_BACKEND: {YOLO_BACKEND}")
+
+    if DETECTION_MODE not in {"single", "cascade"}:
+        raise RuntimeError(f"Unknown DETECTION_MODE: {DETECTION_MODE}")
+
+    if TRACKER_MODE not in {"iou", "sort"}:
+        raise RuntimeError(f"Unknown TRACKER_MODE: {TRACKER_MODE}")
+
+    if YOLO_INT8 and YOLO_BACKEND != "onnx":
+        raise RuntimeError("YOLO_INT8=true requires YOLO_BACKEND=onnx")
+
+    if FRAME_SAMPLING_MODE not in {"fixed", "adaptive"}:
+        raise RuntimeError(f"Unknown FRAME_SAMPLING_MODE: {FRAME_SAMPLING_MODE}")
+
+    if CROP_STORAGE not in {"files", "packed"}:
+        raise RuntimeError(f"Unknown CROP_STORAGE: {CROP_STORAGE}")
+
+    if PRICE_ESTIMATION_MODE not in {"heuristic", "catalog"}:
+        raise RuntimeError(
+            f"Unknown PRICE_ESTIMATION_MODE: {PRICE_ESTIMATION_MODE}"
+        )
+
     if ENABLE_WEB_LOOKUP and not BING_SEARCH_API_KEY:
         raise RuntimeError("ENABLE_WEB_LOOKUP=true but BING_SEARCH_API_KEY is missing")
 
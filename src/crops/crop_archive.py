@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from src.config.paths import CROPS_DIR
+from src.utils.logger import get_logger
+
+log = get_logger("crop-archive")
+
+
+# --------------------------------------------------
+# REFERENCES
+# --------------------------------------------------
+
+
+@dataclass(frozen=True)
+class PackedCrop:
+    """
+    A crop stored inside a per-video archive.
+    """
+
+    archive: Path  # the .pack blob
+    name: str
+
+    def __str__(self) -> str:
+        return f"{self.archive.name}#{self.name}"
+
+
+CropRef = Union[Path, PackedCrop]
+
+
+def archive_path(video_id: str, root: Path = CROPS_DIR) -> Path:
+    return root / f"{video_id}.pack"
+
+
+def _index_path(pack: Path) -> Path:
+    return pack.with_suffix(".idx")
+
+
+def _signature(pack: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = pack.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+# --------------------------------------------------
+# WRITERS
+# --------------------------------------------------
+
+
+class LooseFiles:
+    """
+    Compatibility sink: one JPEG file per crop under `root`.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def put(self, name: str, image: np.ndarray) -> Path:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(path), image)
+        return path
+
+    def close(self) -> None:
+        pass
+
+
+class CropArchive:
+    """
+    Append-only per-video crop archive.
+
+        <video_id>.pack  concatenated JPEG payloads
+        <video_id>.idx   one "name<TAB>offset<TAB>length" line per crop
+
+    Both files are only ever appended to within a run, so a crashed
+    run leaves at worst a trailing payload without an index line. A new
+    run of a video starts from empty files (reset_archive), so re-runs
+    don't grow the pack.
+
+    Encoding happens outside the lock, so crop worker threads only
+    serialize on the append itself. One writer process per video.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._blob = open(path, "ab")
+        self._index = open(_index_path(path), "a", encoding="utf-8")
+        self._offset = self._blob.seek(0, os.SEEK_END)
+        self._lock = threading.Lock()
+
+    def put(self, name: str, image: np.ndarray) -> PackedCrop:
+        ok, buf = cv2.imencode(".jpg", image)
+        if not ok:
+            raise ValueError(f"Could not encode crop: {name}")
+
+        data = buf.tobytes()
+
+        with self._lock:
+            offset = self._offset
+            self._blob.write(data)
+            self._blob.flush()  # payload lands before its index line
+            self._offset += len(data)
+            self._index.write(f"{name}\t{offset}\t{len(data)}\n")
+            self._index.flush()
+
+        return PackedCrop(self.path, name)
+
+    def close(self) -> None:
+        with self._lock:
+            self._blob.close()
+            self._index.close()
+
+    def __enter__(self) -> "CropArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# --------------------------------------------------
+# READER
+# --------------------------------------------------
+
+
+class CropArchiveReader:
+    """
+    Memory-mapped reader for a CropArchive.
+    The index and the mapping are refreshed when a name is missing,
+    so a reader opened mid-run sees crops appended later.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self._refresh()
+
+    def _refresh(self) -> None:
+        index: Dict[str, Tuple[int, int]] = {}
+        idx_path = _index_path(self.path)
+        if idx_path.exists():
+            for line in idx_path.read_text(encoding="utf-8").splitlines():
+                parts = line.split("\t")
+                if len(parts) != 3:
+                    continue  # torn last line
+                index[parts[0]] = (int(parts[1]), int(parts[2]))
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._index = index
+        self.signature = _signature(self.path)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def read_bytes(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None or self._mmap is None or sum(entry) > len(self._mmap):
+                self._refresh()
+                entry = self._index.get(name)
+
+            if entry is None or self._mmap is None or sum(entry) > len(self._mmap):
+                return None
+
+            offset, length = entry
+            return self._mmap[offset : offset + length]
+
+    def read(self, name: str) -> Optional[np.ndarray]:
+        data = self.read_bytes(name)
+        if data is None:
+            return None
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+
+_READERS: Dict[Path, CropArchiveReader] = {}
+_READERS_LOCK = threading.Lock()
+
+
+def open_archive(path: Path) -> CropArchiveReader:
+    """
+    Process-wide shared reader per archive. A reader whose pack changed
+    size or mtime since it was (re)mapped is replaced, so a re-run of a
+    video never serves the previous run's payloads.
+    """
+    with _READERS_LOCK:
+        reader = _READERS.get(path)
+        if reader is not None and reader.signature != _signature(path):
+            reader.close()
+            reader = None
+        if reader is None:
+            reader = _READERS[path] = CropArchiveReader(path)
+        return reader
+
+
+def reset_archive(path: Path) -> None:
+    """
+    Empty a video's pack and index before a new run writes it again.
+    """
+    with _READERS_LOCK:
+        reader = _READERS.pop(path, None)
+        if reader is not None:
+            reader.close()
+
+    for file in (path, _index_path(path)):
+        if file.exists():
+            with open(file, "r+b") as f:
+                f.truncate(0)
+
+
+# --------------------------------------------------
+# LOADING
+# --------------------------------------------------
+
+
+def load_crop(ref: CropRef) -> Optional[np.ndarray]:
+    """
+    Decode a crop (BGR) from either storage format.
+    """
+    if isinstance(ref, PackedCrop):
+        image = open_archive(ref.archive).read(ref.name)
+    else:
+        image = cv2.imread(str(ref))
+
+    if image is None:
+        log.warning(f"Could not load crop: {ref}")
+    return image
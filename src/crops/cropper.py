@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 
 import cv2
+import numpy as np
 
 from src.config.paths import CROPS_DIR
+from src.config.settings import CROP_STORAGE, CROP_WORKERS, SAVE_REJECTED_CROPS
+from src.crops.crop_archive import (
+    CropArchive,
+    LooseFiles,
+    archive_path,
+    reset_archive,
+)
+from src.crops.face_cropper import face_box
+from src.crops.quality_check import assess_crop
+from src.processing.frame_store import FrameRef, FrameStore
 from src.utils.logger import get_logger, log_section
+from src.utils.parallel import ordered_map
 
 log = get_logger("cropper")
 
+CropSink = Union[CropArchive, LooseFiles]
+
 
 # --------------------------------------------------
 # HELPERS
@@ -45,51 +60,210 @@ def _expand_bbox(
 # --------------------------------------------------
 
 
-def crop_items(
-    tracked_items: List[Dict],
-    video_id: str,
-) -> List[Dict]:
+def _crop_face(
+    image: np.ndarray,
+    item: Dict,
+    face_sink: CropSink,
+) -> Dict:
     """
-    Crop detected items from their best frames.
+    Face crop for a person item, cut from the already-decoded frame.
     """
+    h, w = image.shape[:2]
+    box = face_box(item["bbox"], w, h)
+    if box is None:
+        return {}
 
-    log_section("Cropping Detected Items")
+    fx1, fy1, fx2, fy2 = box
+    face = image[fy1:fy2, fx1:fx2]
+    if face.size == 0:
+        return {}
 
-    output_dir = CROPS_DIR / video_id
-    output_dir.mkdir(parents=True, exist_ok=True)
+    # own the pixels: a view would keep the whole frame alive
+    face = face.copy()
+    face_ref = face_sink.put(f"{item['id']}_face.jpg", face)
 
-    cropped_items: List[Dict] = []
+    return {"face_crop": face_ref, "face_image": face}
 
-    for idx, item in enumerate(tracked_items):
-        frame_path: Path = item["frame"]  # ✅ FIXED
-        bbox = item["bbox"]
 
-        image = cv2.imread(str(frame_path))
-        if image is None:
-            log.warning(f"Could not read frame: {frame_path}")
-            continue
+def _rejected(
+    item: Dict,
+    crop: np.ndarray,
+    crop_name: str,
+    crop_sink: CropSink,
+    bbox: List[int],
+    reason: str,
+    metrics: Dict,
+) -> Dict:
+    """
+    Rejected-crop record; the JPEG is only written in debug mode.
+    """
+    crop_path = None
+    if SAVE_REJECTED_CROPS:
+        crop_path = crop_sink.put(f"rejected/{crop_name}", crop)
 
-        h, w = image.shape[:2]
-        x1, y1, x2, y2 = _expand_bbox(bbox, w, h)
+    return {
+        **item,
+        **metrics,
+        "reason": reason,
+        "crop_path": crop_path,
+        "bbox": bbox,
+    }
+
+
+def _crop_frame(
+    frame_ref: FrameRef,
+    indices: List[int],
+    tracked_items: List[Dict],
+    frame_store: FrameStore,
+    crop_sink: CropSink,
+    face_sink: Optional[CropSink],
+    assess: bool,
+) -> List[Tuple[int, Dict]]:
+    """
+    All crops (and person faces) taken from one frame, as (item index, crop).
+    """
+    image = frame_store.get(frame_ref)
+    if image is None:
+        log.warning(f"Could not read frame: {frame_ref}")
+        return []
+
+    h, w = image.shape[:2]
+    results: List[Tuple[int, Dict]] = []
+
+    for idx in indices:
+        item = tracked_items[idx]
+
+        x1, y1, x2, y2 = _expand_bbox(item["bbox"], w, h)
 
         crop = image[y1:y2, x1:x2]
         if crop.size == 0:
             log.warning("Empty crop skipped")
             continue
 
-        crop_name = f"{item['id']}_{frame_path.stem}.jpg"
-        crop_path = output_dir / crop_name
+        crop_name = f"{item['id']}_{frame_ref.stem}.jpg"
+
+        scored: Dict = {}
+        if assess:
+            reason, metrics = assess_crop(crop)
+            if reason:
+                results.append(
+                    (
+                        idx,
+                        _rejected(
+                            item, crop, crop_name, crop_sink, [x1, y1, x2, y2],
+                            reason, metrics,
+                        ),
+                    )
+                )
+                continue
+            scored = {"quality": metrics}
 
-        cv2.imwrite(str(crop_path), crop)
+        face: Dict = {}
+        if face_sink is not None and item.get("item") == "person":
+            face = _crop_face(image, item, face_sink)
+
+        # kept crops outlive the frame: copy so the item dict doesn't pin
+        # the whole decoded frame (and defeat the FrameStore bound)
+        crop = crop.copy()
+        crop_path = crop_sink.put(crop_name, crop)
 
         # ✅ PRESERVE METADATA
-        cropped_items.append(
-            {
-                **item,  # keep id, frame, face_crop, etc
-                "crop_path": crop_path,
-                "bbox": [x1, y1, x2, y2],
-            }
+        results.append(
+            (
+                idx,
+                {
+                    **item,  # keep id, frame, face_crop, etc
+                    **face,
+                    **scored,
+                    "crop_path": crop_path,
+                    "crop_image": crop,
+                    "bbox": [x1, y1, x2, y2],
+                },
+            )
         )
 
-    log.info(f"Saved {len(cropped_items)} cropped items")
+    return results
+
+
+def start_crop_run(video_id: str, storage: str = CROP_STORAGE) -> None:
+    """
+    Drop a previous run's packed crops for this video. Loose files are
+    simply overwritten by name.
+    """
+    if storage == "packed":
+        reset_archive(archive_path(video_id))
+
+
+def crop_items(
+    tracked_items: List[Dict],
+    video_id: str,
+    frame_store: FrameStore,
+    face_dir: Optional[Path] = None,
+    assess: bool = False,
+    workers: int = CROP_WORKERS,
+    storage: str = CROP_STORAGE,
+) -> List[Dict]:
+    """
+    Crop detected items from their best frames.
+
+    Items are grouped by frame so each referenced frame is fetched
+    (and, on a store miss, decoded) once for all of its crops; frame
+    groups run on `workers` threads. With `face_dir`, person items also
+    get a face crop from the same array. Crop arrays are kept on the
+    item so later stages skip a re-read; output order follows
+    `tracked_items` regardless of `workers`.
+
+    With `assess`, each crop is quality-scored in memory before anything
+    is encoded: rejected crops come back with a `reason` and no file
+    (unless SAVE_REJECTED_CROPS), and filter_crops only partitions them.
+
+    storage:
+        files  → one JPEG per crop in CROPS_DIR/<video_id>/ and face_dir
+                 (crop_path / face_crop are Paths)
+        packed → crops and faces appended to CROPS_DIR/<video_id>.pack
+                 (crop_path / face_crop are PackedCrop refs, see load_crop)
+    """
+
+    log_section("Cropping Detected Items")
+
+    if storage == "packed":
+        crop_sink = CropArchive(archive_path(video_id))
+        face_sink = crop_sink if face_dir is not None else None
+    else:
+        crop_sink = LooseFiles(CROPS_DIR / video_id)
+        face_sink = LooseFiles(face_dir) if face_dir is not None else None
+
+    by_frame: Dict[FrameRef, List[int]] = defaultdict(list)
+    for idx, item in enumerate(tracked_items):
+        by_frame[item["frame"]].append(idx)
+
+    try:
+        groups = ordered_map(
+            lambda group: _crop_frame(
+                group[0],
+                group[1],
+                tracked_items,
+                frame_store,
+                crop_sink,
+                face_sink,
+                assess,
+            ),
+            sorted(by_frame.items()),
+            workers=workers,
+            name="crop",
+        )
+    finally:
+        crop_sink.close()
+
+    results = sorted(
+        (pair for group in groups for pair in group),
+        key=lambda pair: pair[0],
+    )
+    cropped_items = [crop for _, crop in results]
+
+    saved = sum(1 for c in cropped_items if "reason" not in c)
+    log.info(
+        f"Saved {saved} cropped items "
+        f"from {len(by_frame)} frames"
+    )
     return cropped_items
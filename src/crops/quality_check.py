@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from src.config.settings import CROP_WORKERS, QUALITY_MAX_SIDE
+from src.crops.crop_archive import load_crop
 from src.utils.logger import get_logger, log_section
+from src.utils.parallel import ordered_map
 
 log = get_logger("quality-check")
 
@@ -25,35 +27,107 @@ MAX_BLACK_RATIO = 0.6          # too dark / empty
 
 
 # --------------------------------------------------
-# METRICS
+# METRICS (FUSED)
 # --------------------------------------------------
 
-def _blur_score(image: np.ndarray) -> float:
+def _quality_metrics(image: np.ndarray) -> Dict[str, float]:
+    """
+    Blur, contrast and dark ratio from a single grayscale conversion.
+    Crops larger than QUALITY_MAX_SIDE are downscaled first.
+    """
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    return cv2.Laplacian(gray, cv2.CV_64F).var()
 
+    h, w = gray.shape
+    if QUALITY_MAX_SIDE and max(h, w) > QUALITY_MAX_SIDE:
+        scale = QUALITY_MAX_SIDE / max(h, w)
+        gray = cv2.resize(
+            gray,
+            (max(1, int(w * scale)), max(1, int(h * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
 
-def _contrast_score(image: np.ndarray) -> float:
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    return float(gray.std())
+    _, contrast = cv2.meanStdDev(gray)
+    _, lap_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_64F))
 
+    return {
+        "blur": float(lap_std[0, 0]) ** 2,  # Laplacian variance
+        "contrast": float(contrast[0, 0]),
+        "black_ratio": cv2.countNonZero(cv2.compare(gray, 15, cv2.CMP_LT)) / gray.size,
+    }
 
-def _black_ratio(image: np.ndarray) -> float:
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    black_pixels = np.sum(gray < 15)
-    return black_pixels / gray.size
+
+def assess_crop(image: np.ndarray) -> Tuple[Optional[str], Dict[str, float]]:
+    """
+    Score an in-memory crop.
+
+    Returns:
+        (reason, metrics) — reason is None when the crop is accepted.
+    """
+    h, w = image.shape[:2]
+    area = h * w
+
+    # ------------------------------------------
+    # SIZE CHECK
+    # ------------------------------------------
+
+    if w < MIN_WIDTH or h < MIN_HEIGHT or area < MIN_AREA:
+        return "too_small", {}
+
+    metrics = _quality_metrics(image)
+
+    # ------------------------------------------
+    # BLUR / CONTRAST / BLACK CHECKS
+    # ------------------------------------------
+
+    if metrics["blur"] < BLUR_THRESHOLD:
+        return "too_blurry", {"blur_score": round(metrics["blur"], 2)}
+
+    if metrics["contrast"] < MIN_CONTRAST_STD:
+        return "low_contrast", {"contrast": round(metrics["contrast"], 2)}
+
+    if metrics["black_ratio"] > MAX_BLACK_RATIO:
+        return "mostly_dark", {"black_ratio": round(metrics["black_ratio"], 2)}
+
+    return None, {k: round(v, 2) for k, v in metrics.items()}
 
 
 # --------------------------------------------------
 # MAIN
 # --------------------------------------------------
 
+def _score_item(item: Dict) -> None:
+    """
+    Score one unscored crop in place (sets `quality` or `reason`).
+    """
+    image = item.get("crop_image")
+    if image is None and item.get("crop_path"):
+        image = load_crop(item["crop_path"])
+    if image is None:
+        item["reason"] = "unreadable_image"
+        return
+
+    reason, metrics = assess_crop(image)
+
+    if reason:
+        item["reason"] = reason
+        item.update(metrics)
+        return
+
+    item["quality"] = metrics
+
+
 def filter_crops(
     cropped_items: List[Dict],
+    workers: int = CROP_WORKERS,
 ) -> Tuple[List[Dict], List[Dict]]:
     """
     Filter cropped images by quality.
 
+    Items already scored by crop_items (reject-before-write) carry
+    `quality` or `reason` and are only partitioned; anything else is
+    scored from its in-memory crop, falling back to the stored crop (file or archive),
+    on `workers` threads.
+
     Returns:
         (accepted, rejected)
 
@@ -65,71 +139,18 @@ def filter_crops(
     accepted: List[Dict] = []
     rejected: List[Dict] = []
 
-    for item in cropped_items:
-        crop_path: Path = item["crop_path"]
-
-        image = cv2.imread(str(crop_path))
-        if image is None:
-            item["reason"] = "unreadable_image"
-            rejected.append(item)
-            continue
-
-        h, w = image.shape[:2]
-        area = h * w
-
-        # ------------------------------------------
-        # SIZE CHECK
-        # ------------------------------------------
-
-        if w < MIN_WIDTH or h < MIN_HEIGHT or area < MIN_AREA:
-            item["reason"] = "too_small"
-            rejected.append(item)
-            continue
-
-        # ------------------------------------------
-        # BLUR CHECK
-        # ------------------------------------------
-
-        blur = _blur_score(image)
-        if blur < BLUR_THRESHOLD:
-            item["reason"] = "too_blurry"
-            item["blur_score"] = round(blur, 2)
-            rejected.append(item)
-            continue
-
-        # ------------------------------------------
-        # CONTRAST CHECK
-        # ------------------------------------------
-
-        contrast = _contrast_score(image)
-        if contrast < MIN_CONTRAST_STD:
-            item["reason"] = "low_contrast"
-            item["contrast"] = round(contrast, 2)
-            rejected.append(item)
-            continue
-
-        # ------------------------------------------
-        # BLACK / EMPTY CHECK
-        # ------------------------------------------
+    ordered_map(
+        _score_item,
+        [c for c in cropped_items if "reason" not in c and "quality" not in c],
+        workers=workers,
+        name="quality",
+    )
 
-        black_ratio = _black_ratio(image)
-        if black_ratio > MAX_BLACK_RATIO:
-            item["reason"] = "mostly_dark"
-            item["black_ratio"] = round(black_ratio, 2)
+    for item in cropped_items:
+        if "reason" in item:
             rejected.append(item)
-            continue
-
-        # ------------------------------------------
-        # ACCEPT
-        # ------------------------------------------
-
-        item["quality"] = {
-            "blur": round(blur, 2),
-            "contrast": round(contrast, 2),
-            "black_ratio": round(black_ratio, 2),
-        }
-
-        accepted.append(item)
+        else:
+            accepted.append(item)
 
     log.info(
         f"Accepted {len(accepted)} / "
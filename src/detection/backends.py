@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import hashlib
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+
+from ultralytics import YOLO
+
+from src.config.paths import YOLO_DIR
+from src.utils.logger import get_logger
+
+log = get_logger("detector-backend")
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+EXPORT_DIR = YOLO_DIR / "exports"
+
+# backend → (ultralytics export format, artifact suffix)
+EXPORT_FORMATS = {
+    "onnx": ("onnx", ".onnx"),
+    "openvino": ("openvino", "_openvino_model"),
+}
+
+BACKENDS = ("torch", *EXPORT_FORMATS)
+
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def weights_digest(model: Any, fallback: str) -> str:
+    """
+    Hash of the weights a YOLO object was loaded from.
+    Falls back to hashing the name when the file cannot be found
+    (e.g. auto-downloaded to an ultralytics cache dir).
+    """
+    ckpt = getattr(model, "ckpt_path", None) or fallback
+    path = Path(str(ckpt))
+    if path.is_file():
+        return file_digest(path)
+    return hashlib.sha256(str(ckpt).encode()).hexdigest()
+
+
+def export_artifact_path(
+    weights_name: str,
+    digest: str,
+    backend: str,
+    imgsz: int,
+    suffix: str = "",
+) -> Path:
+    _, ext = EXPORT_FORMATS[backend]
+    stem = Path(weights_name).stem
+    return EXPORT_DIR / f"{stem}-{digest[:16]}-{imgsz}{suffix}{ext}"
+
+
+# --------------------------------------------------
+# PUBLIC API
+# --------------------------------------------------
+
+
+def load_detection_model(
+    weights: str,
+    backend: str = "torch",
+    imgsz: int = 640,
+    int8: bool = False,
+) -> tuple[Any, str]:
+    """
+    Load YOLO weights for the requested inference backend.
+
+    Non-torch backends are exported once and cached under
+    models/yolo/exports/, keyed by the weights' hash and input size.
+    `int8` (onnx only) additionally caches a statically quantized copy
+    calibrated on YOLO_INT8_CALIBRATION_DIR, keyed by that set's hash.
+
+    Returns (model, weights_digest).
+    """
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend: {backend}")
+
+    if int8 and backend != "onnx":
+        raise ValueError("INT8 quantization is only supported with the onnx backend")
+
+    torch_model = YOLO(weights)
+    digest = weights_digest(torch_model, weights)
+
+    if backend == "torch":
+        return torch_model, digest
+
+    artifact = export_artifact_path(weights, digest, backend, imgsz)
+
+    if artifact.exists():
+        log.info(f"Using cached {backend} export → {artifact}")
+    else:
+        artifact = _export(torch_model, backend, imgsz, artifact)
+
+    if int8:
+        artifact = _quantized(artifact, weights, digest, imgsz)
+
+    return YOLO(str(artifact), task="detect"), digest
+
+
+def _quantized(fp32_path: Path, weights: str, digest: str, imgsz: int) -> Path:
+    from src.config.settings import YOLO_INT8_CALIBRATION_DIR
+    from src.detection.quantization import (
+        calibration_digest,
+        calibration_frames,
+        quantize_onnx_model,
+    )
+
+    paths = calibration_frames(YOLO_INT8_CALIBRATION_DIR)
+    if not paths:
+        raise RuntimeError(
+            f"No calibration images under {YOLO_INT8_CALIBRATION_DIR} "
+            "(fill it with: python -m src.detection.quantization --video ...)"
+        )
+
+    calib = calibration_digest(paths)[:8]
+    int8_path = export_artifact_path(
+        weights, digest, "onnx", imgsz, suffix=f"-int8-{calib}"
+    )
+    if int8_path.exists():
+        log.info(f"Using cached INT8 export → {int8_path}")
+        return int8_path
+
+    quantize_onnx_model(fp32_path, int8_path, imgsz, paths)
+    _copy_onnx_metadata(fp32_path, int8_path)
+    return int8_path
+
+
+def _copy_onnx_metadata(src: Path, dst: Path) -> None:
+    """
+    Ultralytics reads class names/stride from ONNX metadata;
+    make sure the quantized model keeps them.
+    """
+    import onnx
+
+    src_model = onnx.load(str(src), load_external_data=False)
+    dst_model = onnx.load(str(dst))
+
+    existing = {p.key for p in dst_model.metadata_props}
+    missing = [p for p in src_model.metadata_props if p.key not in existing]
+    if not missing:
+        return
+
+    for prop in missing:
+        entry = dst_model.metadata_props.add()
+        entry.key, entry.value = prop.key, prop.value
+    onnx.save(dst_model, str(dst))
+
+
+def _export(
+    torch_model: Any,
+    backend: str,
+    imgsz: int,
+    artifact: Path,
+    **export_kwargs: Any,
+) -> Path:
+    fmt, _ = EXPORT_FORMATS[backend]
+    log.info(f"Exporting YOLO model to {backend} (imgsz={imgsz})…")
+
+    exported: Optional[str] = torch_model.export(
+        format=fmt,
+        imgsz=imgsz,
+        dynamic=True,  # allow batched predict calls
+        verbose=False,
+        **export_kwargs,
+    )
+    if not exported:
+        raise RuntimeError(f"YOLO export to {backend} failed")
+
+    artifact.parent.mkdir(parents=True, exist_ok=True)
+    if artifact.is_dir():
+        shutil.rmtree(artifact)
+    elif artifact.exists():
+        artifact.unlink()
+    shutil.move(str(exported), str(artifact))
+
+    log.info(f"Cached {backend} export → {artifact}")
+    return artifact
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+# --------------------------------------------------
+# IOU
+# --------------------------------------------------
+
+
+def pairwise_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    IoU matrix between (N, 4) and (M, 4) [x1, y1, x2, y2] boxes → (N, M).
+    """
+    a = a.astype(np.float64, copy=False)
+    b = b.astype(np.float64, copy=False)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        iou = np.where(inter > 0, inter / union, 0.0)
+    return iou
+
+
+# --------------------------------------------------
+# NMS
+# --------------------------------------------------
+
+
+def nms_rows(rows: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Class-aware greedy NMS over (N, 6) rows
+    [class_id, confidence, x1, y1, x2, y2].
+    """
+    if rows.shape[0] <= 1:
+        return rows
+
+    keep: List[int] = []
+    for cls in np.unique(rows[:, 0]):
+        idx = np.flatnonzero(rows[:, 0] == cls)
+        idx = idx[np.argsort(-rows[idx, 1], kind="stable")]
+
+        while idx.size:
+            best = idx[0]
+            keep.append(int(best))
+            if idx.size == 1:
+                break
+            ious = pairwise_iou(rows[best : best + 1, 2:6], rows[idx[1:], 2:6])[0]
+            idx = idx[1:][ious < iou_threshold]
+
+    return rows[np.sort(np.array(keep, dtype=np.int64))]
+
+
+# --------------------------------------------------
+# GEOMETRY
+# --------------------------------------------------
+
+
+def expand_box(
+    box: np.ndarray,
+    img_width: int,
+    img_height: int,
+    padding_ratio: float,
+) -> Tuple[int, int, int, int]:
+    x1, y1, x2, y2 = (float(v) for v in box)
+    pad_w = (x2 - x1) * padding_ratio
+    pad_h = (y2 - y1) * padding_ratio
+    return (
+        max(0, int(x1 - pad_w)),
+        max(0, int(y1 - pad_h)),
+        min(img_width, int(x2 + pad_w)),
+        min(img_height, int(y2 + pad_h)),
+    )
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from src.processing.frame_store import FrameRef
+
+
+# --------------------------------------------------
+# COLUMNAR DETECTIONS
+# --------------------------------------------------
+
+
+@dataclass
+class DetectionBatch:
+    """
+    Columnar detections: one row per box.
+
+    frame_index points into `frames`, so a batch stays a handful of
+    NumPy arrays no matter how many boxes it holds.
+    """
+
+    frames: List[FrameRef]
+    frame_index: np.ndarray  # (N,) int32
+    class_id: np.ndarray  # (N,) int32
+    confidence: np.ndarray  # (N,) float32
+    bbox: np.ndarray  # (N, 4) int32, [x1, y1, x2, y2]
+    class_names: Dict[int, str] = field(default_factory=dict)
+
+    # --------------------------------------------------
+    # CONSTRUCTION
+    # --------------------------------------------------
+
+    @classmethod
+    def empty(
+        cls,
+        frames: Sequence[FrameRef] = (),
+        class_names: Dict[int, str] | None = None,
+    ) -> "DetectionBatch":
+        return cls(
+            frames=list(frames),
+            frame_index=np.zeros(0, dtype=np.int32),
+            class_id=np.zeros(0, dtype=np.int32),
+            confidence=np.zeros(0, dtype=np.float32),
+            bbox=np.zeros((0, 4), dtype=np.int32),
+            class_names=dict(class_names or {}),
+        )
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "DetectionBatch":
+        """
+        Build a batch from legacy per-box dicts.
+        """
+        frames: List[FrameRef] = []
+        frame_lookup: Dict[Any, int] = {}
+        name_lookup: Dict[str, int] = {}
+
+        frame_index = np.empty(len(records), dtype=np.int32)
+        class_id = np.empty(len(records), dtype=np.int32)
+
+        for i, det in enumerate(records):
+            frame = det["frame"]
+            if frame not in frame_lookup:
+                frame_lookup[frame] = len(frames)
+                frames.append(frame)
+            frame_index[i] = frame_lookup[frame]
+            class_id[i] = name_lookup.setdefault(det["item"], len(name_lookup))
+
+        return cls(
+            frames=frames,
+            frame_index=frame_index,
+            class_id=class_id,
+            confidence=np.array(
+                [d["confidence"] for d in records], dtype=np.float32
+            ),
+            bbox=np.array(
+                [d["bbox"] for d in records], dtype=np.int32
+            ).reshape(-1, 4),
+            class_names={v: k for k, v in name_lookup.items()},
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence["DetectionBatch"]) -> "DetectionBatch":
+        """
+        Merge batches, remapping frame indices onto a shared frame list.
+        """
+        if not batches:
+            return cls.empty()
+
+        frames: List[FrameRef] = []
+        lookup: Dict[FrameRef, int] = {}
+        class_names: Dict[int, str] = {}
+        frame_index: List[np.ndarray] = []
+
+        for batch in batches:
+            class_names.update(batch.class_names)
+            remap = np.empty(len(batch.frames), dtype=np.int32)
+            for i, ref in enumerate(batch.frames):
+                if ref not in lookup:
+                    lookup[ref] = len(frames)
+                    frames.append(ref)
+                remap[i] = lookup[ref]
+            frame_index.append(
+                remap[batch.frame_index] if len(batch) else batch.frame_index
+            )
+
+        return cls(
+            frames=frames,
+            frame_index=np.concatenate(frame_index).astype(np.int32),
+            class_id=np.concatenate([b.class_id for b in batches]).astype(np.int32),
+            confidence=np.concatenate([b.confidence for b in batches]).astype(
+                np.float32
+            ),
+            bbox=np.concatenate([b.bbox for b in batches]).astype(np.int32),
+            class_names=class_names,
+        )
+
+    # --------------------------------------------------
+    # ACCESS
+    # --------------------------------------------------
+
+    def __len__(self) -> int:
+        return int(self.class_id.shape[0])
+
+    def select(self, mask: np.ndarray) -> "DetectionBatch":
+        return DetectionBatch(
+            frames=self.frames,
+            frame_index=self.frame_index[mask],
+            class_id=self.class_id[mask],
+            confidence=self.confidence[mask],
+            bbox=self.bbox[mask],
+            class_names=self.class_names,
+        )
+
+    def item_names(self) -> List[str]:
+        return [self.class_names.get(int(c), str(int(c))) for c in self.class_id]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Row-wise view in the legacy per-box dict shape.
+        """
+        names = self.item_names()
+        frame_index = self.frame_index.tolist()
+        confidence = self.confidence.tolist()
+        bbox = self.bbox.tolist()
+
+        return [
+            {
+                "frame": self.frames[frame_index[i]],
+                "item": names[i],
+                "confidence": float(confidence[i]),
+                "bbox": bbox[i],
+            }
+            for i in range(len(self))
+        ]
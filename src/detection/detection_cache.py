@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.config.paths import CACHE_DIR
+from src.utils.hashing import file_digest
+from src.utils.logger import get_logger
+
+log = get_logger("detection-cache")
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+DETECTION_CACHE_DIR = CACHE_DIR / "detections"
+
+ROW_DTYPE = np.dtype("<f4")  # little-endian float32
+ROW_WIDTH = 6  # class_id, confidence, x1, y1, x2, y2
+
+
+# --------------------------------------------------
+# KEYS
+# --------------------------------------------------
+
+
+def config_digest(config: Dict[str, Any]) -> str:
+    """
+    Everything that changes detector output for the same pixels:
+    weights hash, thresholds, class set, input size, mode, backend…
+    """
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+# --------------------------------------------------
+# CACHE
+# --------------------------------------------------
+
+RECORD_HEADER = struct.Struct("<16sI")  # frame digest (raw), row count
+
+
+class _VideoPack:
+    """
+    One append-only file of detection records for one video:
+    [digest(16) | n_rows(u32) | n_rows × 6 float32] ...
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: Dict[str, np.ndarray] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+
+        raw = self.path.read_bytes()
+        row_bytes = ROW_DTYPE.itemsize * ROW_WIDTH
+
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(raw):
+            digest, n = RECORD_HEADER.unpack_from(raw, offset)
+            end = offset + RECORD_HEADER.size + n * row_bytes
+            if end > len(raw):
+                break
+            self.entries[digest.hex()] = np.frombuffer(
+                raw, dtype=ROW_DTYPE, count=n * ROW_WIDTH,
+                offset=offset + RECORD_HEADER.size,
+            ).reshape(-1, ROW_WIDTH).astype(np.float32)
+            offset = end
+
+        if offset < len(raw):
+            # torn last record from an interrupted run: drop it so new
+            # records start at a record boundary
+            log.warning(f"Truncating torn detection cache tail: {self.path.name}")
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def append(self, records: Dict[str, np.ndarray]) -> None:
+        if not records:
+            return
+
+        chunks = []
+        for digest, rows in records.items():
+            data = np.ascontiguousarray(rows, dtype=ROW_DTYPE).reshape(-1, ROW_WIDTH)
+            chunks.append(RECORD_HEADER.pack(bytes.fromhex(digest), len(data)))
+            chunks.append(data.tobytes())
+            self.entries[digest] = data.astype(np.float32)
+
+        with open(self.path, "ab") as f:
+            f.write(b"".join(chunks))
+
+
+class DetectionCache:
+    """
+    Persistent detection cache under CACHE_DIR/detections/.
+
+    Layout: <config_digest>/config.json + one <file_digest>.pack per
+    video, each holding every frame's (N, 6) float32 rows keyed by
+    frame content, so a run adds one file per video rather than per
+    frame. Packs are named by the video file's content, so re-uploads
+    under a new id hit the same pack; video ids are only aliases,
+    recorded in aliases.json (register_video). Unregistered ids fall
+    back to a pack named after the id.
+
+    A video's pack is read once on first use; records are appended per
+    detection batch. One writer process per video.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        root: Path = DETECTION_CACHE_DIR,
+    ) -> None:
+        self.namespace = config_digest(config)
+        self.root = root / self.namespace
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        manifest = self.root / "config.json"
+        if not manifest.exists():
+            manifest.write_text(
+                json.dumps(config, indent=2, sort_keys=True, default=str),
+                encoding="utf-8",
+            )
+
+        self._aliases_file = self.root / "aliases.json"
+        self._aliases: Dict[str, str] = {}
+        if self._aliases_file.exists():
+            try:
+                self._aliases = json.loads(
+                    self._aliases_file.read_text(encoding="utf-8")
+                )
+            except ValueError:
+                log.warning(f"Ignoring unreadable {self._aliases_file}")
+
+        self._packs: Dict[str, _VideoPack] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def register_video(self, video_id: str, video_path: Path) -> None:
+        """
+        Point `video_id` at the pack for the file's content.
+        """
+        digest = file_digest(video_path)
+        if self._aliases.get(video_id) == digest:
+            return
+
+        self._aliases[video_id] = digest
+        tmp = self._aliases_file.with_suffix(".json.tmp")
+        tmp.write_text(
+            json.dumps(self._aliases, indent=2, sort_keys=True), encoding="utf-8"
+        )
+        tmp.replace(self._aliases_file)
+
+    def _pack(self, video_id: str) -> _VideoPack:
+        key = self._aliases.get(video_id, video_id)
+        pack = self._packs.get(key)
+        if pack is None:
+            safe = re.sub(r"[^A-Za-z0-9._-]+", "_", key)
+            pack = self._packs[key] = _VideoPack(self.root / f"{safe}.pack")
+        return pack
+
+    def get_many(
+        self,
+        video_id: str,
+        digests: Sequence[str],
+    ) -> List[Optional[np.ndarray]]:
+        entries = self._pack(video_id).entries
+        rows = [entries.get(d) for d in digests]
+
+        found = sum(r is not None for r in rows)
+        self.hits += found
+        self.misses += len(rows) - found
+        return rows
+
+    def put_many(
+        self,
+        video_id: str,
+        digests: Sequence[str],
+        rows: Sequence[np.ndarray],
+    ) -> None:
+        self._pack(video_id).append(dict(zip(digests, rows)))
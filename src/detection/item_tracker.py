@@ -1,13 +1,32 @@
 from __future__ import annotations
 
-from typing import Dict, List
-from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Union
 
+import numpy as np
+
+from src.config.settings import (
+    TRACKER_IOU_THRESHOLD,
+    TRACKER_MAX_AGE,
+    TRACKER_MODE,
+)
+from src.detection.box_ops import pairwise_iou
+from src.detection.detection_batch import DetectionBatch
+from src.detection.sort_tracker import SortTracker, Track
+from src.detection.spatial_index import GridIndex
 from src.utils.logger import get_logger, log_section
 
 log = get_logger("item-tracker")
 
 
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# below this many clusters per class a dense IoU matrix is cheaper
+# than grid lookups; above it (crowd scenes) the grid wins
+GRID_MIN_CLUSTERS = 256
+
+
 # --------------------------------------------------
 # IOU
 # --------------------------------------------------
@@ -33,27 +52,231 @@ def _iou(box1: List[int], box2: List[int]) -> float:
     return inter_area / float(box1_area + box2_area - inter_area)
 
 
+# --------------------------------------------------
+# GREEDY CLUSTERING (VECTORIZED)
+# --------------------------------------------------
+
+
+def _cluster_greedy(
+    boxes: np.ndarray,
+    iou_threshold: float,
+    chunk_size: int = 1024,
+    grid_min_clusters: int = GRID_MIN_CLUSTERS,
+) -> np.ndarray:
+    """
+    Cluster labels for (N, 4) boxes with the same greedy semantics as
+    the scalar loop: each box joins the FIRST cluster (creation order)
+    whose first member has IoU >= threshold, otherwise starts a new one.
+
+    Boxes are processed in chunks: chunk boxes are matched against
+    existing cluster heads, then a small (chunk × chunk) matrix handles
+    boxes that open new clusters inside the chunk. Matching against
+    heads is a dense (chunk × clusters) IoU matrix until there are
+    `grid_min_clusters` clusters; past that, heads live in a uniform
+    grid and only boxes sharing a cell are IoU-tested.
+    """
+    n = boxes.shape[0]
+    labels = np.empty(n, dtype=np.int64)
+    heads = np.empty((0, 4), dtype=boxes.dtype)
+    grid: Optional[GridIndex] = None
+
+    for start in range(0, n, chunk_size):
+        chunk = boxes[start : start + chunk_size]
+        n_heads = heads.shape[0]
+
+        if grid is None and n_heads >= grid_min_clusters and iou_threshold > 0:
+            sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+            grid = GridIndex(cell_size=float(np.median(sizes)))
+            grid.insert(heads, np.arange(n_heads))
+
+        if grid is not None:
+            matched, first = _match_heads_grid(chunk, heads, grid, iou_threshold)
+            labels[start : start + len(chunk)][matched] = first[matched]
+        elif n_heads:
+            hits = pairwise_iou(chunk, heads) >= iou_threshold
+            matched = hits.any(axis=1)
+            labels[start : start + len(chunk)][matched] = hits[matched].argmax(axis=1)
+        else:
+            matched = np.zeros(len(chunk), dtype=bool)
+
+        pending = np.flatnonzero(~matched)
+        if not pending.size:
+            continue
+
+        local = pairwise_iou(chunk[pending], chunk[pending]) >= iou_threshold
+        new_heads: List[int] = []  # positions in `pending`
+
+        for k, pos in enumerate(pending):
+            if new_heads:
+                row = local[k, new_heads]
+                if row.any():
+                    head = pending[new_heads[int(row.argmax())]]
+                    labels[start + pos] = labels[start + head]
+                    continue
+            labels[start + pos] = n_heads + len(new_heads)
+            new_heads.append(k)
+
+        added = chunk[pending[new_heads]]
+        heads = np.concatenate([heads, added])
+        if grid is not None:
+            grid.insert(added, np.arange(n_heads, n_heads + len(added)))
+
+    return labels
+
+
+def _match_heads_grid(
+    chunk: np.ndarray,
+    heads: np.ndarray,
+    grid: GridIndex,
+    iou_threshold: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For each chunk box: whether any head reaches the threshold, and the
+    lowest (first-created) such head — same answer as the dense argmax.
+    """
+    query, head = grid.candidate_pairs(chunk)
+
+    a, b = chunk[query].astype(np.float64), heads[head].astype(np.float64)
+    inter = np.clip(
+        np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0]), 0, None
+    ) * np.clip(np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1]), 0, None)
+    union = (
+        (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+        + (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+        - inter
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        iou = np.where(inter > 0, inter / union, 0.0)
+
+    hit = iou >= iou_threshold
+    first = np.full(len(chunk), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first, query[hit], head[hit])
+
+    return first != np.iinfo(np.int64).max, first
+
+
+def _best_per_cluster(labels: np.ndarray, confidence: np.ndarray) -> np.ndarray:
+    """
+    Index of the highest-confidence member of each cluster
+    (first occurrence wins ties, like max()).
+    """
+    order = np.lexsort((np.arange(labels.size), -confidence, labels))
+    first = np.ones(order.size, dtype=bool)
+    first[1:] = labels[order][1:] != labels[order][:-1]
+    return order[first]
+
+
+# --------------------------------------------------
+# TEMPORAL TRACKING (SORT)
+# --------------------------------------------------
+
+
+class StreamingItemTracker:
+    """
+    Incremental tracker fed by the detector's batch stream.
+
+    update(batch) advances the SORT tracker through the batch's frames
+    (time order) and returns the items whose tracks just closed;
+    finalize() flushes the rest. Items have the same shape as
+    track_items() output, ids are assigned per class as items are emitted.
+    """
+
+    def __init__(
+        self,
+        frame_weights: Optional[Dict] = None,
+        iou_threshold: float = TRACKER_IOU_THRESHOLD,
+        max_age: int = TRACKER_MAX_AGE,
+    ) -> None:
+        self._sort = SortTracker(
+            iou_threshold=iou_threshold,
+            max_age=max_age,
+            frame_weights=frame_weights,
+        )
+        self._class_names: Dict[int, str] = {}
+        self._counters: Dict[int, int] = {}
+        self.detections_seen = 0
+        self.items_emitted = 0
+
+    def update(self, batch: DetectionBatch) -> List[Dict]:
+        self._class_names.update(batch.class_names)
+        self.detections_seen += len(batch)
+
+        by_frame = np.argsort(batch.frame_index, kind="stable")
+        bounds = np.searchsorted(
+            batch.frame_index[by_frame],
+            np.arange(len(batch.frames) + 1),
+        )
+        order = np.argsort([ref.frame_idx for ref in batch.frames], kind="stable")
+
+        closed: List[Track] = []
+        for f in order:
+            rows = by_frame[bounds[f] : bounds[f + 1]]
+            closed.extend(
+                self._sort.step(
+                    batch.frames[f],
+                    batch.class_id[rows],
+                    batch.confidence[rows],
+                    batch.bbox[rows],
+                )
+            )
+
+        return self._emit(closed)
+
+    def finalize(self) -> List[Dict]:
+        return self._emit(self._sort.finish())
+
+    def _emit(self, tracks: List[Track]) -> List[Dict]:
+        items: List[Dict] = []
+        for track in sorted(tracks, key=lambda t: t.track_id):
+            name = self._class_names.get(track.class_id, str(track.class_id))
+            idx = self._counters.get(track.class_id, 0)
+            self._counters[track.class_id] = idx + 1
+
+            items.append(
+                {
+                    "id": f"{name}_{idx}",
+                    "item": name,
+                    "frame": track.best_frame,
+                    "confidence": float(track.best_confidence),
+                    "bbox": track.best_bbox,
+                    "frames_seen": int(track.frames_seen),
+                }
+            )
+
+        self.items_emitted += len(items)
+        return items
+
+
 # --------------------------------------------------
 # TRACKER
 # --------------------------------------------------
 
 
 def track_items(
-    detections: List[Dict],
-    iou_threshold: float = 0.5,
+    detections: Union[DetectionBatch, List[Dict]],
+    iou_threshold: Optional[float] = None,
+    frame_weights: Optional[Dict] = None,
+    mode: str = TRACKER_MODE,
 ) -> List[Dict]:
     """
     Merge detections across frames into unique items.
 
     Input:
         detections: output from object_detector
+        iou_threshold: match threshold (default 0.5 for iou,
+            TRACKER_IOU_THRESHOLD for sort)
+        frame_weights: {frame: n} — frames standing in for n sampled
+            frames after near-duplicate suppression (default 1)
+        mode:
+            iou  → global greedy IoU clustering (ignores time)
+            sort → Kalman + Hungarian online tracking over frame order
 
     Output:
         [
           {
             "id": str,
             "item": str,
-            "frame": Path,
+            "frame": FrameRef,
             "confidence": float,
             "bbox": [x1, y1, x2, y2],
             "frames_seen": int
@@ -63,54 +286,65 @@ def track_items(
 
     log_section("Item Tracking & Deduplication")
 
-    grouped: Dict[str, List[Dict]] = defaultdict(list)
+    batch = (
+        detections
+        if isinstance(detections, DetectionBatch)
+        else DetectionBatch.from_records(detections)
+    )
 
-    # --------------------------------------------------
-    # GROUP BY ITEM TYPE
-    # --------------------------------------------------
+    weights = frame_weights or {}
+
+    if mode == "sort":
+        tracker = StreamingItemTracker(
+            frame_weights=weights,
+            iou_threshold=(
+                TRACKER_IOU_THRESHOLD if iou_threshold is None else iou_threshold
+            ),
+        )
+        final_items = tracker.update(batch) + tracker.finalize()
+        log.info(f"Tracked {len(batch)} detections → {len(final_items)} items")
+        return final_items
 
-    for det in detections:
-        grouped[det["item"]].append(det)
+    frame_w = np.array(
+        [weights.get(ref, 1) for ref in batch.frames],
+        dtype=np.int64,
+    )
 
     final_items: List[Dict] = []
 
     # --------------------------------------------------
-    # PROCESS EACH ITEM TYPE
+    # PROCESS EACH ITEM TYPE (first-seen order)
     # --------------------------------------------------
 
-    for item_name, item_detections in grouped.items():
-        clusters: List[List[Dict]] = []
-
-        for det in item_detections:
-            matched = False
+    _, first_seen = np.unique(batch.class_id, return_index=True)
 
-            for cluster in clusters:
-                if _iou(det["bbox"], cluster[0]["bbox"]) >= iou_threshold:
-                    cluster.append(det)
-                    matched = True
-                    break
+    for class_id in batch.class_id[np.sort(first_seen)]:
+        item_name = batch.class_names.get(int(class_id), str(int(class_id)))
+        idx = np.flatnonzero(batch.class_id == class_id)
 
-            if not matched:
-                clusters.append([det])
+        labels = _cluster_greedy(
+            batch.bbox[idx], 0.5 if iou_threshold is None else iou_threshold
+        )
 
         # --------------------------------------------------
         # PICK BEST FROM EACH CLUSTER
         # --------------------------------------------------
 
-        for idx, cluster in enumerate(clusters):
-            best = max(cluster, key=lambda d: d["confidence"])
+        best = idx[_best_per_cluster(labels, batch.confidence[idx])]
+        seen = np.bincount(labels, weights=frame_w[batch.frame_index[idx]])
 
+        for cluster_idx, det_idx in enumerate(best):
             final_items.append(
                 {
-                    "id": f"{item_name}_{idx}",  # ✅ stable ID
+                    "id": f"{item_name}_{cluster_idx}",  # ✅ stable ID
                     "item": item_name,
-                    "frame": best["frame"],  # ✅ expected downstream
-                    "confidence": float(best["confidence"]),
-                    "bbox": best["bbox"],
-                    "frames_seen": len(cluster),
+                    "frame": batch.frames[int(batch.frame_index[det_idx])],
+                    "confidence": float(batch.confidence[det_idx]),
+                    "bbox": batch.bbox[det_idx].tolist(),
+                    "frames_seen": int(seen[cluster_idx]),
                 }
             )
 
-    log.info(f"Reduced {len(detections)} detections → {len(final_items)} items")
+    log.info(f"Reduced {len(batch)} detections → {len(final_items)} items")
 
     return final_items
@@ -1,23 +1,42 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Set, Union
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 
-import cv2
-from ultralytics import YOLO  # ✅ correct public import
+import numpy as np
 
 from src.config.settings import (
     YOLO_MODEL_PATH,
     YOLO_CONFIDENCE_THRESHOLD,
     YOLO_IOU_THRESHOLD,
+    YOLO_BATCH_SIZE,
+    YOLO_BACKEND,
+    YOLO_IMGSZ,
+    YOLO_INT8,
     DETECTION_CLASSES,
+    DETECTION_MODE,
+    CASCADE_ROI_CLASSES,
+    CASCADE_PERSON_IMGSZ,
+    CASCADE_ROI_IMGSZ,
+    CASCADE_ROI_PADDING,
+    ENABLE_DETECTION_CACHE,
 )
+from src.detection.backends import load_detection_model
+from src.detection.box_ops import expand_box, nms_rows
+from src.detection.detection_cache import DetectionCache
+from src.detection.detection_batch import DetectionBatch
+from src.processing.frame_store import FrameRef, FrameStore
+from src.utils.hashing import frame_digest
 from src.utils.logger import get_logger, log_section, ProgressTracker
 
 log = get_logger("object-detector")
 
 
 NamesType = Union[Dict[int, str], List[str]]
+LoadedBatch = List[Tuple[FrameRef, Optional[np.ndarray]]]
+
+_EMPTY_ROWS = np.zeros((0, 6), dtype=np.float32)
 
 
 def _normalize_names(names: NamesType) -> Dict[int, str]:
@@ -33,14 +52,87 @@ def _normalize_names(names: NamesType) -> Dict[int, str]:
     return {i: str(name) for i, name in enumerate(names)}
 
 
+def _to_numpy(values: Any) -> np.ndarray:
+    if hasattr(values, "cpu"):
+        values = values.cpu()
+    if hasattr(values, "numpy"):
+        return values.numpy()
+    return np.asarray(values)
+
+
+def _rows_to_batch(
+    frames: List[FrameRef],
+    rows: List[np.ndarray],
+    class_names: Dict[int, str],
+) -> DetectionBatch:
+    """
+    Per-image (N, 6) rows → one columnar batch over `frames`.
+    """
+    counts = [r.shape[0] for r in rows]
+    stacked = np.concatenate(rows) if rows else _EMPTY_ROWS
+
+    return DetectionBatch(
+        frames=list(frames),
+        frame_index=np.repeat(np.arange(len(frames), dtype=np.int32), counts),
+        class_id=stacked[:, 0].astype(np.int32),
+        confidence=stacked[:, 1].astype(np.float32),
+        bbox=stacked[:, 2:6].astype(np.int32),
+        class_names=class_names,
+    )
+
+
+def _load_batch(refs: List[FrameRef], frame_store: FrameStore) -> LoadedBatch:
+    return [(ref, frame_store.get(ref)) for ref in refs]
+
+
+def _prefetch_batches(
+    frames: List[FrameRef],
+    frame_store: FrameStore,
+    batch_size: int,
+) -> Iterator[LoadedBatch]:
+    """
+    Yield decoded batches while the next one is loaded on a
+    background thread (overlaps frame decode with inference).
+    """
+    chunks = [
+        frames[i : i + batch_size] for i in range(0, len(frames), batch_size)
+    ]
+    if not chunks:
+        return
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as pool:
+        pending = pool.submit(_load_batch, chunks[0], frame_store)
+
+        for next_chunk in chunks[1:]:
+            current = pending.result()
+            pending = pool.submit(_load_batch, next_chunk, frame_store)
+            yield current
+
+        yield pending.result()
+
+
 class FashionObjectDetector:
     """
     YOLO-based fashion item detector.
     Instantiate ONCE per pipeline run.
     """
 
-    def __init__(self) -> None:
-        log.info("Loading YOLO model...")
+    def __init__(
+        self,
+        batch_size: int = YOLO_BATCH_SIZE,
+        backend: str = YOLO_BACKEND,
+        imgsz: int = YOLO_IMGSZ,
+        int8: bool = YOLO_INT8,
+        mode: str = DETECTION_MODE,
+        use_cache: bool = ENABLE_DETECTION_CACHE,
+    ) -> None:
+        precision = "int8" if int8 else "fp32"
+        log.info(f"Loading YOLO model ({backend} backend, {precision})...")
+
+        self.batch_size = max(1, batch_size)
+        self.backend = backend
+        self.imgsz = imgsz
+        self.int8 = int8
 
         model_path = Path(YOLO_MODEL_PATH)
 
@@ -50,14 +142,21 @@ class FashionObjectDetector:
 
         if model_path.exists():
             log.info(f"Using custom YOLO weights → {model_path}")
-            self.model = YOLO(str(model_path))
+            weights = str(model_path)
         else:
             log.warning(
                 f"Custom YOLO weights not found at {model_path}. "
                 "Falling back to yolov8n.pt"
             )
             # Ultralytics auto-downloads this on first run
-            self.model = YOLO("yolov8n.pt")
+            weights = "yolov8n.pt"
+
+        self.model, self.weights_digest = load_detection_model(
+            weights,
+            backend=backend,
+            imgsz=imgsz,
+            int8=int8,
+        )
 
         # --------------------------------------------------
         # CLASS FILTERING
@@ -82,91 +181,281 @@ class FashionObjectDetector:
             enabled = [self.class_names[i] for i in sorted(self.allowed_class_ids)]
             log.info(f"Enabled classes: {enabled}")
 
+        self.class_filter: List[int] = sorted(self.allowed_class_ids)
+
+        self._setup_cascade(mode)
+
+        self.cache: Optional[DetectionCache] = (
+            DetectionCache(self.cache_config()) if use_cache else None
+        )
+
     # --------------------------------------------------
     # DETECTION
     # --------------------------------------------------
 
-    def detect(self, frames: List[Path]) -> List[Dict[str, Any]]:
+    def _infer(
+        self,
+        images: List[np.ndarray],
+        classes: Optional[List[int]] = None,
+        imgsz: Optional[int] = None,
+    ) -> List[np.ndarray]:
         """
-        Run detection on extracted frames.
+        One predict call for a list of images.
 
-        Returns:
-        [
-            {
-                "frame": Path,
-                "item": str,
-                "confidence": float,
-                "bbox": [x1, y1, x2, y2]
-            }
+        Returns one (N, 6) float32 array per image:
+        [class_id, confidence, x1, y1, x2, y2]
+        """
+        classes = self.class_filter if classes is None else classes
+
+        results = self.model.predict(
+            source=images,
+            conf=YOLO_CONFIDENCE_THRESHOLD,
+            iou=YOLO_IOU_THRESHOLD,
+            imgsz=imgsz or self.imgsz,
+            classes=classes,  # filtered before NMS
+            verbose=False,
+        )
+
+        # results can be None or empty
+        if not results:
+            return [_EMPTY_ROWS for _ in images]
+
+        # one result per input image, in order
+        wanted = np.array(classes, dtype=np.int32)
+        rows = [self._result_rows(result, wanted) for result in results]
+        return rows + [_EMPTY_ROWS] * (len(images) - len(rows))
+
+    def _result_rows(self, result: Any, wanted: np.ndarray) -> np.ndarray:
+        boxes = getattr(result, "boxes", None)
+
+        # boxes can be None
+        if boxes is None or len(boxes) == 0:
+            return _EMPTY_ROWS
+
+        cls = _to_numpy(boxes.cls).reshape(-1)
+        conf = _to_numpy(boxes.conf).reshape(-1)
+        xyxy = _to_numpy(boxes.xyxy).reshape(-1, 4)
+
+        rows = np.empty((cls.shape[0], 6), dtype=np.float32)
+        rows[:, 0] = cls
+        rows[:, 1] = conf
+        rows[:, 2:] = xyxy
+
+        # backends that ignore `classes` still get filtered here
+        keep = np.isin(rows[:, 0].astype(np.int32), wanted)
+        return rows[keep]
+
+    # --------------------------------------------------
+    # CASCADE (PERSON ROI → ACCESSORIES)
+    # --------------------------------------------------
+
+    def _setup_cascade(self, mode: str) -> None:
+        person_ids = [
+            i for i in self.class_filter if self.class_names[i].lower() == "person"
         ]
+        roi_names = {c.lower() for c in CASCADE_ROI_CLASSES}
+
+        self.roi_filter: List[int] = [
+            i for i in self.class_filter if self.class_names[i].lower() in roi_names
+        ]
+        self.frame_filter: List[int] = [
+            i for i in self.class_filter if i not in self.roi_filter
+        ]
+        self.person_id: Optional[int] = person_ids[0] if person_ids else None
+
+        self.mode = mode
+        if mode == "cascade" and (self.person_id is None or not self.roi_filter):
+            log.warning(
+                "Cascade mode needs 'person' and at least one ROI class; "
+                "falling back to single-pass detection"
+            )
+            self.mode = "single"
+
+    def _detect_cascade(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        1. low-res pass on full frames: person + non-accessory classes
+        2. accessory classes on person ROIs (upscaled to CASCADE_ROI_IMGSZ),
+           batched across frames, mapped back to frame coordinates
+        """
+        frame_rows = self._infer(
+            images,
+            classes=self.frame_filter,
+            imgsz=CASCADE_PERSON_IMGSZ,
+        )
+
+        rois: List[Tuple[int, Tuple[int, int, int, int]]] = []
+        for i, rows in enumerate(frame_rows):
+            h, w = images[i].shape[:2]
+            for box in rows[rows[:, 0] == self.person_id, 2:6]:
+                x1, y1, x2, y2 = expand_box(box, w, h, CASCADE_ROI_PADDING)
+                if x2 - x1 >= 8 and y2 - y1 >= 8:
+                    rois.append((i, (x1, y1, x2, y2)))
+
+        roi_rows: List[List[np.ndarray]] = [[] for _ in images]
+
+        for start in range(0, len(rois), self.batch_size):
+            chunk = rois[start : start + self.batch_size]
+            crops = [images[i][y1:y2, x1:x2] for i, (x1, y1, x2, y2) in chunk]
+
+            for (i, (x1, y1, _, _)), rows in zip(
+                chunk,
+                self._infer(crops, classes=self.roi_filter, imgsz=CASCADE_ROI_IMGSZ),
+            ):
+                if rows.shape[0]:
+                    mapped = rows.copy()
+                    mapped[:, [2, 4]] += x1
+                    mapped[:, [3, 5]] += y1
+                    roi_rows[i].append(mapped)
+
+        merged: List[np.ndarray] = []
+        for rows, extra in zip(frame_rows, roi_rows):
+            if extra:
+                # overlapping person ROIs can see the same accessory twice
+                accessories = nms_rows(np.concatenate(extra), YOLO_IOU_THRESHOLD)
+                rows = np.concatenate([rows, accessories])
+            merged.append(rows)
+
+        return merged
+
+    def _detect_images(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        if self.mode == "cascade":
+            return self._detect_cascade(images)
+        return self._infer(images)
+
+    # --------------------------------------------------
+    # CACHE
+    # --------------------------------------------------
+
+    def cache_config(self) -> Dict[str, Any]:
+        config: Dict[str, Any] = {
+            "weights": self.weights_digest,
+            "backend": self.backend,
+            "int8": self.int8,
+            "imgsz": self.imgsz,
+            "conf": YOLO_CONFIDENCE_THRESHOLD,
+            "iou": YOLO_IOU_THRESHOLD,
+            "classes": sorted(self.class_names[i] for i in self.class_filter),
+            "mode": self.mode,
+        }
+        if self.mode == "cascade":
+            config["cascade"] = {
+                "roi_classes": sorted(self.class_names[i] for i in self.roi_filter),
+                "person_imgsz": CASCADE_PERSON_IMGSZ,
+                "roi_imgsz": CASCADE_ROI_IMGSZ,
+                "padding": CASCADE_ROI_PADDING,
+            }
+        return config
+
+    def _detect_cached(
+        self,
+        refs: List[FrameRef],
+        images: List[np.ndarray],
+    ) -> List[np.ndarray]:
+        """
+        Serve frames from the detection cache; infer only on misses.
+        """
+        if self.cache is None:
+            return self._detect_images(images)
+
+        rows: List[Optional[np.ndarray]] = [None] * len(images)
+        digests = [frame_digest(img) for img in images]
+
+        for video_id in dict.fromkeys(ref.video_id for ref in refs):
+            idx = [i for i, ref in enumerate(refs) if ref.video_id == video_id]
+            found = self.cache.get_many(video_id, [digests[i] for i in idx])
+            for i, r in zip(idx, found):
+                rows[i] = r
+
+        misses = [i for i, r in enumerate(rows) if r is None]
+        if misses:
+            fresh = self._detect_images([images[i] for i in misses])
+            for i, r in zip(misses, fresh):
+                rows[i] = r
+
+            for video_id in dict.fromkeys(refs[i].video_id for i in misses):
+                idx = [i for i in misses if refs[i].video_id == video_id]
+                self.cache.put_many(
+                    video_id,
+                    [digests[i] for i in idx],
+                    [rows[i] for i in idx],
+                )
+
+        return [r if r is not None else _EMPTY_ROWS for r in rows]
+
+    def detect_stream(
+        self,
+        frames: List[FrameRef],
+        frame_store: FrameStore,
+    ) -> Iterator[DetectionBatch]:
+        """
+        Run detection lazily, yielding one DetectionBatch per predict
+        call (frames in input order) as soon as it is available.
         """
 
         log_section("Object Detection")
-        detections: List[Dict[str, Any]] = []
 
         if not frames:
             log.warning("No frames provided to detector.")
-            return detections
+            return
+
+        if not self.allowed_class_ids:
+            return
+
+        if self.cache is not None:
+            for video_id in dict.fromkeys(ref.video_id for ref in frames):
+                source = frame_store.source(video_id)
+                if source is not None:
+                    self.cache.register_video(video_id, source)
+
+        total = 0
 
         with ProgressTracker(
             title="Running YOLO inference",
             total=len(frames),
         ) as progress:
 
-            for frame_path in frames:
-                image = cv2.imread(str(frame_path))
-                if image is None:
-                    progress.advance()
+            for batch in _prefetch_batches(frames, frame_store, self.batch_size):
+                loaded = [(ref, img) for ref, img in batch if img is not None]
+                progress.advance(len(batch))
+
+                if not loaded:
                     continue
 
-                results = self.model.predict(
-                    source=image,
-                    conf=YOLO_CONFIDENCE_THRESHOLD,
-                    iou=YOLO_IOU_THRESHOLD,
-                    verbose=False,
+                rows = self._detect_cached(
+                    [ref for ref, _ in loaded],
+                    [img for _, img in loaded],
+                )
+                detections = _rows_to_batch(
+                    [ref for ref, _ in loaded],
+                    rows,
+                    self.class_names,
                 )
+                total += len(detections)
+                yield detections
 
-                # results can be None or empty
-                if not results:
-                    progress.advance()
-                    continue
+        if self.cache is not None:
+            log.info(
+                f"Detection cache: {self.cache.hits} hits / "
+                f"{self.cache.misses} misses"
+            )
+
+        log.info(f"Detected {total} items total")
+
+    def detect(
+        self,
+        frames: List[FrameRef],
+        frame_store: FrameStore,
+    ) -> DetectionBatch:
+        """
+        Run detection on extracted frames.
+
+        Returns a columnar DetectionBatch
+        (frame_index, class_id, confidence, bbox arrays).
+        Use `.to_records()` for the per-box dict view.
+        """
+        parts = list(self.detect_stream(frames, frame_store))
+
+        if not parts:
+            return DetectionBatch.empty(frames, self.class_names)
 
-                for result in results:
-                    boxes = getattr(result, "boxes", None)
-
-                    # boxes can be None
-                    if boxes is None or len(boxes) == 0:
-                        continue
-
-                    for box in boxes:
-                        cls_tensor = getattr(box, "cls", None)
-                        conf_tensor = getattr(box, "conf", None)
-                        xyxy_tensor = getattr(box, "xyxy", None)
-
-                        if (
-                            cls_tensor is None
-                            or conf_tensor is None
-                            or xyxy_tensor is None
-                        ):
-                            continue
-
-                        cls_id = int(cls_tensor[0])
-                        if cls_id not in self.allowed_class_ids:
-                            continue
-
-                        confidence = float(conf_tensor[0])
-                        x1, y1, x2, y2 = map(int, xyxy_tensor[0].tolist())
-
-                        detections.append(
-                            {
-                                "frame": frame_path,
-                                "item": self.class_names.get(cls_id, str(cls_id)),
-                                "confidence": confidence,
-                                "bbox": [x1, y1, x2, y2],
-                            }
-                        )
-
-                progress.advance()
-
-        log.info(f"Detected {len(detections)} items total")
-        return detections
+        return DetectionBatch.concat(parts)
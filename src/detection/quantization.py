@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from src.config.settings import (
+    YOLO_INT8_CALIBRATION_DIR,
+    YOLO_INT8_CALIBRATION_FRAMES,
+)
+from src.processing.frame_sampler import iter_sampled_frames, probe_video
+from src.utils.logger import get_logger
+
+log = get_logger("quantization")
+
+
+# --------------------------------------------------
+# PREPROCESSING (MATCHES ULTRALYTICS LETTERBOX)
+# --------------------------------------------------
+
+
+def letterbox(image: np.ndarray, imgsz: int) -> np.ndarray:
+    """
+    Resize keeping aspect ratio and pad to imgsz x imgsz (gray 114),
+    then BGR → RGB, HWC → NCHW float32 in [0, 1].
+    """
+    h, w = image.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top = (imgsz - new_h) // 2
+    left = (imgsz - new_w) // 2
+    canvas[top : top + new_h, left : left + new_w] = resized
+
+    tensor = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return np.ascontiguousarray(tensor[None])
+
+
+# --------------------------------------------------
+# CALIBRATION SET
+# --------------------------------------------------
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+
+def calibration_images(calib_dir: Path = YOLO_INT8_CALIBRATION_DIR) -> List[Path]:
+    if not calib_dir.is_dir():
+        return []
+    return sorted(
+        p for p in calib_dir.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES
+    )
+
+
+def calibration_frames(
+    calib_dir: Path = YOLO_INT8_CALIBRATION_DIR,
+    limit: int = YOLO_INT8_CALIBRATION_FRAMES,
+) -> List[Path]:
+    """
+    Evenly spaced subset of the images in the calibration directory.
+    """
+    paths = calibration_images(calib_dir)
+    if len(paths) <= limit:
+        return paths
+    picks = np.linspace(0, len(paths) - 1, num=limit).astype(int)
+    return [paths[i] for i in picks]
+
+
+def calibration_digest(paths: Sequence[Path]) -> str:
+    """
+    Content hash of a calibration set; part of the INT8 cache key.
+    """
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.name.encode("utf-8"))
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def export_calibration_frames(
+    video_paths: Sequence[Path],
+    out_dir: Path = YOLO_INT8_CALIBRATION_DIR,
+    per_video: int = 32,
+) -> List[Path]:
+    """
+    Write evenly spaced frames of held-out videos to
+    <out_dir>/<video stem>/<frame_idx>.jpg.
+    """
+    written: List[Path] = []
+    for video_path in video_paths:
+        _, _, total, _ = probe_video(video_path)
+        indices = np.unique(
+            np.linspace(0, max(0, total - 1), num=per_video).astype(int)
+        )
+
+        video_dir = out_dir / video_path.stem
+        video_dir.mkdir(parents=True, exist_ok=True)
+
+        for frame_idx, frame in iter_sampled_frames(video_path, indices=indices):
+            path = video_dir / f"{frame_idx:06d}.jpg"
+            cv2.imwrite(str(path), frame)
+            written.append(path)
+
+    log.info(f"Wrote {len(written)} calibration frames → {out_dir}")
+    return written
+
+
+# --------------------------------------------------
+# CALIBRATION READER
+# --------------------------------------------------
+
+
+def _make_reader(input_name: str, paths: List[Path], imgsz: int):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class FrameCalibrationReader(CalibrationDataReader):
+        def __init__(self) -> None:
+            self._it: Iterator[Dict[str, np.ndarray]] = self._feeds()
+
+        def _feeds(self) -> Iterator[Dict[str, np.ndarray]]:
+            for path in paths:
+                image = cv2.imread(str(path))
+                if image is not None:
+                    yield {input_name: letterbox(image, imgsz)}
+
+        def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+            return next(self._it, None)
+
+        def rewind(self) -> None:
+            self._it = self._feeds()
+
+    return FrameCalibrationReader()
+
+
+# --------------------------------------------------
+# PUBLIC API
+# --------------------------------------------------
+
+
+def quantize_onnx_model(
+    fp32_path: Path,
+    int8_path: Path,
+    imgsz: int,
+    paths: Sequence[Path],
+) -> Path:
+    """
+    Post-training static INT8 quantization of an exported YOLO ONNX
+    model, calibrated on `paths` (see `calibration_frames`).
+
+    Only Conv/MatMul weights and activations are quantized (QDQ format);
+    the detection head's decode/concat stays in FP32.
+    """
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+
+    session = ort.InferenceSession(str(fp32_path), providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+    del session
+
+    log.info(f"Calibrating INT8 model on {len(paths)} frames…")
+
+    int8_path.parent.mkdir(parents=True, exist_ok=True)
+    quantize_static(
+        model_input=str(fp32_path),
+        model_output=str(int8_path),
+        calibration_data_reader=_make_reader(input_name, list(paths), imgsz),
+        quant_format=QuantFormat.QDQ,
+        op_types_to_quantize=["Conv", "MatMul"],
+        per_channel=True,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8,
+    )
+
+    log.info(f"INT8 model saved → {int8_path}")
+    return int8_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fill the INT8 calibration directory from held-out videos."
+    )
+    parser.add_argument("--video", type=Path, nargs="+", required=True)
+    parser.add_argument("--per-video", type=int, default=32)
+    parser.add_argument("--out", type=Path, default=YOLO_INT8_CALIBRATION_DIR)
+    args = parser.parse_args()
+
+    export_calibration_frames(args.video, args.out, args.per_video)
+
+
+if __name__ == "__main__":
+    main()
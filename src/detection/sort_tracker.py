@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from src.config.settings import TRACKER_IOU_THRESHOLD, TRACKER_MAX_AGE
+from src.detection.box_ops import pairwise_iou
+from src.processing.frame_store import FrameRef
+
+
+# --------------------------------------------------
+# KALMAN FILTER (CONSTANT VELOCITY, SORT PARAMETRISATION)
+# --------------------------------------------------
+
+# state: [cx, cy, area, aspect, vcx, vcy, varea]
+_H = np.hstack([np.eye(4), np.zeros((4, 3))])
+_R = np.diag([1.0, 1.0, 10.0, 10.0])
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+
+
+def _box_to_z(box: np.ndarray) -> np.ndarray:
+    w = max(float(box[2] - box[0]), 1.0)
+    h = max(float(box[3] - box[1]), 1.0)
+    return np.array([box[0] + w / 2, box[1] + h / 2, w * h, w / h])
+
+
+def _x_to_box(x: np.ndarray) -> np.ndarray:
+    area = max(float(x[2]), 1.0)
+    aspect = max(float(x[3]), 1e-6)
+    w = np.sqrt(area * aspect)
+    h = area / w
+    return np.array([x[0] - w / 2, x[1] - h / 2, x[0] + w / 2, x[1] + h / 2])
+
+
+class KalmanBox:
+    """
+    Constant-velocity Kalman filter over one bounding box.
+    `dt` is measured in source-video frames, so irregular sampling
+    (adaptive mode, dropped duplicates) is handled naturally.
+    """
+
+    def __init__(self, box: np.ndarray) -> None:
+        self.x = np.zeros(7)
+        self.x[:4] = _box_to_z(box)
+        self.P = _P0.copy()
+
+    def predict(self, dt: float) -> np.ndarray:
+        if self.x[2] + self.x[6] * dt <= 0:
+            self.x[6] = 0.0
+
+        F = np.eye(7)
+        F[0, 4] = F[1, 5] = F[2, 6] = dt
+
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + _Q * max(dt, 1.0)
+        return _x_to_box(self.x)
+
+    def update(self, box: np.ndarray) -> None:
+        y = _box_to_z(box) - _H @ self.x
+        S = _H @ self.P @ _H.T + _R
+        K = self.P @ _H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ _H) @ self.P
+
+    @property
+    def box(self) -> np.ndarray:
+        return _x_to_box(self.x)
+
+
+# --------------------------------------------------
+# TRACK
+# --------------------------------------------------
+
+
+@dataclass(eq=False)
+class Track:
+    track_id: int
+    class_id: int
+    kalman: KalmanBox
+    last_frame: int
+    frames_seen: int = 0
+    best_confidence: float = -1.0
+    best_frame: Optional[FrameRef] = None
+    best_bbox: List[int] = field(default_factory=list)
+
+    def observe(
+        self,
+        frame: FrameRef,
+        confidence: float,
+        bbox: np.ndarray,
+        weight: int,
+    ) -> None:
+        self.last_frame = frame.frame_idx
+        self.frames_seen += weight
+        if confidence > self.best_confidence:
+            self.best_confidence = confidence
+            self.best_frame = frame
+            self.best_bbox = [int(v) for v in bbox]
+
+
+# --------------------------------------------------
+# TRACKER
+# --------------------------------------------------
+
+
+class SortTracker:
+    """
+    Online multi-object tracker (SORT): Kalman motion prediction plus
+    Hungarian assignment on IoU, class-aware.
+
+    Feed frames in time order with `step()`. A track closes once it
+    has gone `max_age` source frames without a matching detection.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = TRACKER_IOU_THRESHOLD,
+        max_age: int = TRACKER_MAX_AGE,
+        frame_weights: Optional[Dict[FrameRef, int]] = None,
+    ) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.frame_weights = frame_weights or {}
+
+        self.active: List[Track] = []
+        self._next_id = 0
+        self._last_frame: Optional[int] = None
+
+    def step(
+        self,
+        frame: FrameRef,
+        class_id: np.ndarray,
+        confidence: np.ndarray,
+        bbox: np.ndarray,
+    ) -> List[Track]:
+        """
+        Advance to `frame` with its detections.
+        Returns the tracks that closed at this step.
+        """
+        dt = 1.0 if self._last_frame is None else frame.frame_idx - self._last_frame
+        self._last_frame = frame.frame_idx
+
+        predicted = (
+            np.array([t.kalman.predict(max(dt, 0.0)) for t in self.active])
+            if self.active
+            else np.zeros((0, 4))
+        )
+
+        matched_tracks, matched_dets = self._associate(predicted, class_id, bbox)
+
+        weight = self.frame_weights.get(frame, 1)
+
+        for t_idx, d_idx in zip(matched_tracks, matched_dets):
+            track = self.active[t_idx]
+            track.kalman.update(bbox[d_idx].astype(np.float64))
+            track.observe(frame, float(confidence[d_idx]), bbox[d_idx], weight)
+
+        unmatched = np.setdiff1d(np.arange(len(class_id)), matched_dets)
+        for d_idx in unmatched:
+            track = Track(
+                track_id=self._next_id,
+                class_id=int(class_id[d_idx]),
+                kalman=KalmanBox(bbox[d_idx].astype(np.float64)),
+                last_frame=frame.frame_idx,
+            )
+            track.observe(frame, float(confidence[d_idx]), bbox[d_idx], weight)
+            self.active.append(track)
+            self._next_id += 1
+
+        return self._expire(frame.frame_idx)
+
+    def finish(self) -> List[Track]:
+        """
+        Close every remaining track.
+        """
+        done, self.active = self.active, []
+        return done
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _associate(
+        self,
+        predicted: np.ndarray,
+        class_id: np.ndarray,
+        bbox: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        empty = np.zeros(0, dtype=np.int64)
+        if not len(predicted) or not len(bbox):
+            return empty, empty
+
+        iou = pairwise_iou(predicted, bbox)
+
+        track_classes = np.array([t.class_id for t in self.active])
+        iou[track_classes[:, None] != class_id[None, :]] = 0.0
+
+        rows, cols = linear_sum_assignment(-iou)
+        keep = iou[rows, cols] >= self.iou_threshold
+        return rows[keep], cols[keep]
+
+    def _expire(self, frame_idx: int) -> List[Track]:
+        expired: List[Track] = []
+        alive: List[Track] = []
+        for track in self.active:
+            if frame_idx - track.last_frame > self.max_age:
+                expired.append(track)
+            else:
+                alive.append(track)
+
+        self.active = alive
+        return expired
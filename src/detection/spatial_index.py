@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+
+def _expand_ranges(starts: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For ranges [starts[i], starts[i] + counts[i]) return
+    (owner, position) pairs, fully vectorized.
+    """
+    owner = np.repeat(np.arange(counts.size), counts)
+    offsets = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, starts[owner] + offsets
+
+
+# --------------------------------------------------
+# UNIFORM GRID
+# --------------------------------------------------
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial index over [x1, y1, x2, y2] boxes.
+
+    Every box is registered in each cell it overlaps, so two boxes that
+    intersect always share a cell. candidate_pairs() therefore returns a
+    superset of the pairs with IoU > 0 — callers still run the exact test,
+    but only on those pairs instead of the full (queries × boxes) matrix.
+
+    Cell membership is kept as one sorted key array (CSR-style), so both
+    insertion and lookup are NumPy operations over whole batches.
+    """
+
+    _STRIDE = np.int64(1 << 31)
+
+    def __init__(self, cell_size: float) -> None:
+        self.cell_size = max(float(cell_size), 1.0)
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cells(self, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (owner, cell_key) for every cell covered by every box.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        c = np.floor(boxes / self.cell_size).astype(np.int64)
+        width = c[:, 2] - c[:, 0] + 1
+        height = c[:, 3] - c[:, 1] + 1
+
+        owner, k = _expand_ranges(
+            np.zeros(len(boxes), dtype=np.int64), width * height
+        )
+        cx = c[owner, 0] + k % width[owner]
+        cy = c[owner, 1] + k // width[owner]
+        return owner, cx * self._STRIDE + cy
+
+    def insert(self, boxes: np.ndarray, ids: np.ndarray) -> None:
+        owner, keys = self._cells(boxes)
+        keys = np.concatenate([self._keys, keys])
+        ids = np.concatenate([self._ids, np.asarray(ids, dtype=np.int64)[owner]])
+
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._ids = keys[order], ids[order]
+        self._size += len(boxes)
+
+    def candidate_pairs(self, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (query_index, item_id) pairs sharing at least one cell.
+        A pair may appear more than once if the boxes share several cells.
+        """
+        owner, keys = self._cells(boxes)
+        lo = np.searchsorted(self._keys, keys, side="left")
+        hi = np.searchsorted(self._keys, keys, side="right")
+
+        cell, pos = _expand_ranges(lo, hi - lo)
+        return owner[cell], self._ids[pos]
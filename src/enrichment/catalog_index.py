@@ -0,0 +1,511 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src.config.settings import (
+    CATALOG_FLAT_MAX,
+    CATALOG_INDEX_DIR,
+    CATALOG_NPROBE,
+    CATALOG_PATH,
+    CLIP_MODEL_NAME,
+)
+from src.utils.logger import get_logger, log_section
+
+log = get_logger("catalog-index")
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+PQ_TRAIN_SAMPLES = 25_000  # per sub-quantizer codebook (256 centroids)
+RERANK_FACTOR = 10  # exact re-scoring of the top k × this PQ candidates
+
+
+# --------------------------------------------------
+# K-MEANS (NUMPY)
+# --------------------------------------------------
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    """
+    Nearest centroid (L2) per row, chunked to bound memory.
+    """
+    half_norm = 0.5 * (centroids**2).sum(axis=1)
+    labels = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), chunk):
+        block = x[start : start + chunk].astype(np.float32)
+        labels[start : start + chunk] = (block @ centroids.T - half_norm).argmax(axis=1)
+    return labels
+
+
+def _kmeans(
+    x: np.ndarray,
+    k: int,
+    iters: int = 20,
+    seed: int = 0,
+    max_train: int = 100_000,
+) -> np.ndarray:
+    """
+    Lloyd's k-means on (a sample of) x → (k, D) float32 centroids.
+    """
+    rng = np.random.default_rng(seed)
+    if len(x) > max_train:
+        x = x[np.sort(rng.choice(len(x), max_train, replace=False))]
+    x = np.asarray(x, dtype=np.float32)
+
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+
+    for _ in range(iters):
+        labels = _assign(x, centroids)
+        counts = np.bincount(labels, minlength=k)
+
+        onehot = csr_matrix(
+            (np.ones(len(x), dtype=np.float32), (labels, np.arange(len(x)))),
+            shape=(k, len(x)),
+        )
+        sums = np.asarray(onehot @ x)
+
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():  # re-seed dead centroids
+            centroids[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+
+    return centroids
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Column indices of the k highest scores per row, best first.
+    """
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+# --------------------------------------------------
+# FLAT (BRUTE FORCE)
+# --------------------------------------------------
+
+
+class FlatIndex:
+    """
+    Exact inner-product search over float16 vectors (small catalogs).
+    """
+
+    kind = "flat"
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        self.vectors = vectors  # (N, D) float16, usually memory-mapped
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray) -> "FlatIndex":
+        return cls(np.asarray(vectors, dtype=np.float16))
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        chunk: int = 65536,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        best_s = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_i = np.zeros((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, len(self.vectors), chunk):
+            block = np.asarray(self.vectors[start : start + chunk], dtype=np.float32)
+            block_ids = np.broadcast_to(
+                np.arange(start, start + len(block)), (len(queries), len(block))
+            )
+            scores = np.concatenate([best_s, queries @ block.T], axis=1)
+            ids = np.concatenate([best_i, block_ids], axis=1)
+            top = _top_k(scores, k)
+            best_s = np.take_along_axis(scores, top, axis=1)
+            best_i = np.take_along_axis(ids, top, axis=1)
+
+        return best_s, best_i
+
+    def save(self, path: Path) -> None:
+        np.save(path / "vectors.npy", self.vectors)
+
+    @classmethod
+    def load(cls, path: Path) -> "FlatIndex":
+        return cls(np.load(path / "vectors.npy", mmap_mode="r"))
+
+
+# --------------------------------------------------
+# IVF-PQ
+# --------------------------------------------------
+
+
+class IVFPQIndex:
+    """
+    Inverted file + product quantization for large catalogs.
+
+    Vectors are assigned to `nlist` coarse cells; the residual to the
+    cell centroid is stored as `m` one-byte PQ codes (D / m dims each),
+    grouped by cell. With inner products q·x = q·c + q·r, so a query
+    probes the `nprobe` best cells and scores their codes with one
+    (m × 256) lookup table shared by all cells — ~m bytes per catalog
+    item and a few thousand table gathers per query.
+
+    With `rerank`, float16 vectors are kept as well (memory-mapped) and
+    the PQ shortlist is re-scored exactly before taking the top k.
+    """
+
+    kind = "ivfpq"
+
+    def __init__(
+        self,
+        coarse: np.ndarray,  # (nlist, D) float32
+        codebooks: np.ndarray,  # (m, 256, D/m) float32
+        codes: np.ndarray,  # (N, m) uint8, grouped by cell
+        offsets: np.ndarray,  # (nlist + 1,) int64
+        ids: np.ndarray,  # (N,) int64 original row per code
+        vectors: Optional[np.ndarray] = None,  # (N, D) float16, for re-ranking
+    ) -> None:
+        self.coarse = coarse
+        self.codebooks = codebooks
+        self.codes = codes
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def default_params(n: int, dim: int) -> Tuple[int, int]:
+        nlist = int(max(16, min(65536, 4 * np.sqrt(n))))
+        m = next((c for c in (64, 32, 16, 8, 4, 2) if dim % c == 0 and dim // c >= 4), 1)
+        return nlist, m
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        m: Optional[int] = None,
+        seed: int = 0,
+        rerank: bool = True,
+    ) -> "IVFPQIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+
+        default_nlist, default_m = cls.default_params(n, dim)
+        nlist = nlist or default_nlist
+        m = m or default_m
+        if dim % m:
+            raise ValueError(f"PQ sub-quantizers ({m}) must divide dim ({dim})")
+        dsub = dim // m
+
+        coarse = _kmeans(vectors, nlist, seed=seed)
+        cell = _assign(vectors, coarse)
+        residuals = vectors - coarse[cell]
+
+        codebooks = np.stack(
+            [
+                _kmeans(
+                    residuals[:, j * dsub : (j + 1) * dsub],
+                    256,
+                    iters=15,
+                    seed=seed + j + 1,
+                    max_train=PQ_TRAIN_SAMPLES,
+                )
+                for j in range(m)
+            ]
+        )
+        if codebooks.shape[1] < 256:  # tiny catalogs: pad unused codes
+            pad = np.zeros((m, 256 - codebooks.shape[1], dsub), dtype=np.float32)
+            codebooks = np.concatenate([codebooks, pad], axis=1)
+
+        codes = np.empty((n, m), dtype=np.uint8)
+        for j in range(m):
+            codes[:, j] = _assign(residuals[:, j * dsub : (j + 1) * dsub], codebooks[j])
+
+        order = np.argsort(cell, kind="stable")
+        offsets = np.zeros(len(coarse) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(cell, minlength=len(coarse)))
+
+        return cls(
+            coarse,
+            codebooks,
+            codes[order],
+            offsets,
+            order.astype(np.int64),
+            vectors.astype(np.float16) if rerank else None,
+        )
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: int = CATALOG_NPROBE,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype=np.float32)
+        m, _, dsub = self.codebooks.shape
+        nprobe = min(nprobe, len(self.coarse))
+
+        cell_scores = queries @ self.coarse.T
+        probes = _top_k(cell_scores, nprobe)
+
+        # (Q, m, 256) lookup tables in one batched matmul
+        luts = np.einsum(
+            "qmd,mcd->qmc",
+            queries.reshape(len(queries), m, dsub),
+            self.codebooks,
+        )
+
+        out_s = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        out_i = np.full((len(queries), k), -1, dtype=np.int64)
+        sub = np.arange(m)
+
+        for q in range(len(queries)):
+            sizes = self.offsets[probes[q] + 1] - self.offsets[probes[q]]
+            if not sizes.sum():
+                continue
+
+            pos = np.concatenate(
+                [np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes[q]]
+            )
+            base = np.repeat(cell_scores[q, probes[q]], sizes)
+
+            scores = base + luts[q][sub, self.codes[pos]].sum(axis=1)
+
+            if self.vectors is None:
+                top = _top_k(scores[None, :], k)[0]
+                ids = self.ids[pos[top]]
+                scores = scores[top]
+            else:
+                short = _top_k(scores[None, :], k * RERANK_FACTOR)[0]
+                ids = np.sort(self.ids[pos[short]])  # sorted → sequential mmap reads
+                scores = np.asarray(self.vectors[ids], dtype=np.float32) @ queries[q]
+                top = _top_k(scores[None, :], k)[0]
+                ids, scores = ids[top], scores[top]
+
+            out_s[q, : len(ids)] = scores
+            out_i[q, : len(ids)] = ids
+
+        return out_s, out_i
+
+    def save(self, path: Path) -> None:
+        for name in ("coarse", "codebooks", "codes", "offsets", "ids"):
+            np.save(path / f"{name}.npy", getattr(self, name))
+        if self.vectors is not None:
+            np.save(path / "vectors.npy", self.vectors)
+
+    @classmethod
+    def load(cls, path: Path) -> "IVFPQIndex":
+        vectors = path / "vectors.npy"
+        return cls(
+            np.load(path / "coarse.npy"),
+            np.load(path / "codebooks.npy"),
+            np.load(path / "codes.npy", mmap_mode="r"),
+            np.load(path / "offsets.npy"),
+            np.load(path / "ids.npy", mmap_mode="r"),
+            np.load(vectors, mmap_mode="r") if vectors.exists() else None,
+        )
+
+
+VectorIndex = Union[FlatIndex, IVFPQIndex]
+_KINDS = {FlatIndex.kind: FlatIndex, IVFPQIndex.kind: IVFPQIndex}
+
+
+def build_vector_index(
+    vectors: np.ndarray,
+    kind: str = "auto",
+    flat_max: int = CATALOG_FLAT_MAX,
+    **params,
+) -> VectorIndex:
+    """
+    auto → brute force up to `flat_max` vectors, IVF-PQ above.
+    """
+    if kind == "auto":
+        kind = "flat" if len(vectors) <= flat_max else "ivfpq"
+    if kind == "flat":
+        return FlatIndex.build(vectors)
+    return IVFPQIndex.build(vectors, **params)
+
+
+# --------------------------------------------------
+# CATALOG (ONE INDEX PER ITEM CLASS)
+# --------------------------------------------------
+
+
+class CatalogIndex:
+    """
+    On-disk reference catalog: one vector index per item class plus
+    the catalog rows (title, brand, price, …) it points to.
+
+        <root>/manifest.json
+        <root>/<class>/{index arrays}.npy + rows.jsonl
+    """
+
+    def __init__(self, root: Path, manifest: Dict) -> None:
+        self.root = root
+        self.manifest = manifest
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._rows: Dict[str, List[Dict]] = {}
+
+    @classmethod
+    def load(cls, root: Path = CATALOG_INDEX_DIR) -> "CatalogIndex":
+        manifest = json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+        if manifest.get("model") != CLIP_MODEL_NAME:
+            log.warning(
+                f"Catalog index built with {manifest.get('model')}, "
+                f"querying with {CLIP_MODEL_NAME}"
+            )
+        return cls(root, manifest)
+
+    @property
+    def classes(self) -> List[str]:
+        return list(self.manifest["classes"])
+
+    def _index(self, item: str) -> Optional[VectorIndex]:
+        info = self.manifest["classes"].get(item)
+        if info is None:
+            return None
+        if item not in self._indexes:
+            path = self.root / item
+            self._indexes[item] = _KINDS[info["kind"]].load(path)
+            with open(path / "rows.jsonl", "r", encoding="utf-8") as f:
+                self._rows[item] = [json.loads(line) for line in f]
+        return self._indexes[item]
+
+    def search(
+        self,
+        embeddings: np.ndarray,
+        items: Sequence[str],
+        k: int,
+    ) -> List[List[Dict]]:
+        """
+        Batched top-k per query, restricted to the query's item class.
+        Queries whose class has no catalog get [].
+        """
+        results: List[List[Dict]] = [[] for _ in items]
+
+        by_class: Dict[str, List[int]] = defaultdict(list)
+        for q, item in enumerate(items):
+            by_class[item].append(q)
+
+        for item, queries in by_class.items():
+            index = self._index(item)
+            if index is None:
+                continue
+
+            scores, ids = index.search(embeddings[queries], k)
+            rows = self._rows[item]
+
+            for q, s_row, i_row in zip(queries, scores, ids):
+                results[q] = [
+                    {**rows[int(i)], "score": round(float(s), 4)}
+                    for s, i in zip(s_row, i_row)
+                    if i >= 0
+                ]
+
+        return results
+
+
+_CATALOG: Optional[CatalogIndex] = None
+
+
+def get_catalog_index() -> Optional[CatalogIndex]:
+    """
+    Process-wide catalog, or None if no index has been built.
+    """
+    global _CATALOG
+    if _CATALOG is None and (CATALOG_INDEX_DIR / "manifest.json").exists():
+        _CATALOG = CatalogIndex.load(CATALOG_INDEX_DIR)
+    return _CATALOG
+
+
+# --------------------------------------------------
+# BUILDER
+# --------------------------------------------------
+
+
+def build_catalog_index(
+    catalog_path: Path = CATALOG_PATH,
+    out_dir: Path = CATALOG_INDEX_DIR,
+    kind: str = "auto",
+    batch: int = 4096,
+) -> Path:
+    """
+    Embed a reference catalog once and write per-class indexes.
+
+    catalog_path is JSONL, one product per line:
+        {"image": "<path relative to the catalog>", "item": "watch",
+         "price": 12500, "brand": "...", "title": "..."}
+    """
+    from src.classification.attribute_engine import encode_images
+
+    log_section("Catalog Index Build")
+
+    rows_by_class: Dict[str, List[Dict]] = defaultdict(list)
+    with open(catalog_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                rows_by_class[row["item"]].append(row)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest: Dict = {"model": CLIP_MODEL_NAME, "classes": {}}
+
+    for item, rows in rows_by_class.items():
+        start = time.perf_counter()
+
+        vectors = np.concatenate(
+            [
+                # catalog products stay out of the per-crop embedding cache
+                encode_images(
+                    [catalog_path.parent / r["image"] for r in rows[i : i + batch]],
+                    use_cache=False,
+                )
+                for i in range(0, len(rows), batch)
+            ]
+        )
+        index = build_vector_index(vectors, kind=kind)
+
+        path = out_dir / item
+        path.mkdir(parents=True, exist_ok=True)
+        index.save(path)
+        with open(path / "rows.jsonl", "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+        manifest["classes"][item] = {"kind": index.kind, "count": len(rows)}
+        log.info(
+            f"{item}: {len(rows)} products → {index.kind} index "
+            f"({time.perf_counter() - start:.1f}s)"
+        )
+
+    (out_dir / "manifest.json").write_text(
+        json.dumps(manifest, indent=2), encoding="utf-8"
+    )
+    return out_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the price catalog index")
+    parser.add_argument("--catalog", type=Path, default=CATALOG_PATH)
+    parser.add_argument("--out", type=Path, default=CATALOG_INDEX_DIR)
+    parser.add_argument("--kind", choices=["auto", "flat", "ivfpq"], default="auto")
+    args = parser.parse_args()
+
+    build_catalog_index(args.catalog, args.out, args.kind)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pathlib import Path
 import json
+import re
+
+import numpy as np
 
 from src.config.settings import (
+    CATALOG_TOP_K,
     DEFAULT_PRICE_RANGE,
     PRICE_CONFIDENCE_MIN,
+    PRICE_ESTIMATION_MODE,
     ENABLE_WEB_LOOKUP,
 )
 from src.config.paths import MODEL_DIR
@@ -91,6 +96,117 @@ def _estimate_price_for_item(
     }
 
 
+def _format_price(value: float) -> str:
+    return f"${value:,.0f}"
+
+
+def _range_floor(price_range: str) -> Optional[float]:
+    """
+    "$15,000 – $300,000" → 15000.0
+    """
+    match = re.search(r"\$([\d,]+)", price_range)
+    return float(match.group(1).replace(",", "")) if match else None
+
+
+def _estimate_from_matches(item_type: str, matches: List[Dict]) -> Dict:
+    """
+    Catalog-backed estimate from the top-k visually nearest products.
+    """
+    prices = np.array([float(m["price"]) for m in matches])
+    scores = np.array([m["score"] for m in matches])
+
+    # similarity-weighted median
+    order = np.argsort(prices)
+    weights = np.exp((scores[order] - scores.max()) * 20.0)
+    cumulative = np.cumsum(weights) / weights.sum()
+    estimate = float(prices[order][np.searchsorted(cumulative, 0.5)])
+
+    rules = BRAND_RULES.get(item_type.lower(), {})
+    floor = _range_floor(rules.get("luxury_range", ""))
+    is_luxury = floor is not None and estimate >= floor
+
+    return {
+        "price_range": (
+            f"{_format_price(prices.min())} – {_format_price(prices.max())}"
+        ),
+        "price_estimate": estimate,
+        "luxury": is_luxury,
+        "reason": "catalog_match",
+        "matches": matches,
+    }
+
+
+def _catalog_estimates(items: List[Dict]) -> List[Optional[Dict]]:
+    """
+    One batched embed + top-k catalog search for all items.
+    None where the catalog cannot answer (no index / no class entries).
+    """
+    from src.classification.attribute_engine import encode_images
+    from src.enrichment.catalog_index import get_catalog_index
+
+    catalog = get_catalog_index()
+    if catalog is None:
+        log.warning("PRICE_ESTIMATION_MODE=catalog but no catalog index found")
+        return [None] * len(items)
+
+    wanted = [i for i, item in enumerate(items) if item["item"] in catalog.classes]
+    if not wanted:
+        return [None] * len(items)
+
+    embeddings = encode_images(
+        [
+            items[i]["crop_image"] if items[i].get("crop_image") is not None
+            else items[i]["crop_path"]
+            for i in wanted
+        ]
+    )
+    matches = catalog.search(
+        embeddings,
+        [items[i]["item"] for i in wanted],
+        CATALOG_TOP_K,
+    )
+
+    estimates: List[Optional[Dict]] = [None] * len(items)
+    for i, found in zip(wanted, matches):
+        if found:
+            estimates[i] = _estimate_from_matches(items[i]["item"], found)
+    return estimates
+
+
+def _apply_web_prices(items: List[Dict]) -> None:
+    """
+    Live offer prices for every item (looked up concurrently). They
+    replace heuristic ranges only when the query was item-specific
+    (carried attributes); a bare "<class> price" answer is the same for
+    every item of the class, so it is only attached as web_price_range.
+    Catalog matches keep theirs.
+    """
+    from src.enrichment.web_lookup import lookup_prices, query_attributes
+
+    for item, found in zip(items, lookup_prices(items)):
+        if found is None:
+            continue
+
+        item["web_price_range"] = (
+            f"{_format_price(found['price_low'])} – "
+            f"{_format_price(found['price_high'])}"
+        )
+        item["web_offers"] = found["offers"]
+
+        if item["estimation_reason"] == "catalog_match":
+            continue
+
+        if not query_attributes(item):
+            continue
+
+        rules = BRAND_RULES.get(item["item"].lower(), {})
+        floor = _range_floor(rules.get("luxury_range", ""))
+
+        item["price_range"] = item["web_price_range"]
+        item["luxury"] = floor is not None and found["price_median"] >= floor
+        item["estimation_reason"] = "web_lookup"
+
+
 # --------------------------------------------------
 # PUBLIC API
 # --------------------------------------------------
@@ -102,6 +218,11 @@ def estimate_prices(
     """
     Attach price estimates to high-quality cropped items.
 
+    PRICE_ESTIMATION_MODE=catalog looks every crop up in the local
+    reference catalog (one batched top-k search) and falls back to the
+    confidence heuristic for classes the catalog does not cover.
+    ENABLE_WEB_LOOKUP then overrides heuristic ranges with live offers.
+
     Returns:
         [
           {
@@ -117,13 +238,19 @@ def estimate_prices(
 
     log_section("Price Estimation")
 
+    catalog = (
+        _catalog_estimates(quality_items)
+        if PRICE_ESTIMATION_MODE == "catalog"
+        else [None] * len(quality_items)
+    )
+
     enriched: List[Dict] = []
 
-    for item in quality_items:
+    for item, from_catalog in zip(quality_items, catalog):
         item_type = item["item"]
         confidence = item["confidence"]
 
-        estimate = _estimate_price_for_item(
+        estimate = from_catalog or _estimate_price_for_item(
             item_type=item_type,
             confidence=confidence,
         )
@@ -135,13 +262,15 @@ def estimate_prices(
             "estimation_reason": estimate["reason"],
         }
 
+        if from_catalog:
+            enriched_item["price_estimate"] = from_catalog["price_estimate"]
+            enriched_item["catalog_matches"] = from_catalog["matches"]
+
         enriched.append(enriched_item)
 
     log.info(f"Estimated prices for {len(enriched)} items")
 
     if ENABLE_WEB_LOOKUP:
-        log.warning(
-            "ENABLE_WEB_LOOKUP is true, " "but web lookup is not implemented yet."
-        )
+        _apply_web_prices(enriched)
 
     return enriched
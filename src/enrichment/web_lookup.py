@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from src.config.paths import CACHE_DIR
+from src.config.settings import (
+    BING_SEARCH_API_KEY,
+    BING_SEARCH_ENDPOINT,
+    NON_PRODUCT_CLASSES,
+    WEB_LOOKUP_CACHE_TTL,
+    WEB_LOOKUP_CONCURRENCY,
+    WEB_LOOKUP_HOST_RPS,
+    WEB_LOOKUP_RETRIES,
+    WEB_LOOKUP_TIMEOUT,
+)
+from src.utils.logger import get_logger, log_section
+
+log = get_logger("web-lookup")
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+WEB_LOOKUP_CACHE_DIR = CACHE_DIR / "web_lookup"
+
+RESULTS_PER_QUERY = 20
+RETRY_STATUS = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5  # seconds, doubled per attempt (plus jitter)
+MAX_RETRY_AFTER = 30.0
+
+
+# --------------------------------------------------
+# RESPONSE CACHE
+# --------------------------------------------------
+
+
+class ResponseCache:
+    """
+    JSON responses on disk, one file per request, expiring after `ttl`
+    seconds. Files are written to a temp name and renamed into place, so
+    concurrent runs never read a partial entry.
+    """
+
+    def __init__(self, ttl: int, root: Path = WEB_LOOKUP_CACHE_DIR) -> None:
+        self.ttl = ttl
+        self.root = root
+        if ttl > 0:
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> str:
+        raw = json.dumps([url, sorted(params.items())], default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.ttl <= 0:
+            return None
+
+        path = self.root / f"{key}.json"
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("expires", 0) < time.time():
+            return None
+        return entry["body"]
+
+    def put(self, key: str, body: Any) -> None:
+        if self.ttl <= 0:
+            return
+
+        path = self.root / f"{key}.json"
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({"expires": time.time() + self.ttl, "body": body}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+
+
+# --------------------------------------------------
+# RATE LIMITING
+# --------------------------------------------------
+
+
+class HostRateLimiter:
+    """
+    At most `rps` request starts per second per host. Each caller
+    reserves the next free slot for its host, then sleeps until it.
+    """
+
+    def __init__(self, rps: float) -> None:
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._next: Dict[str, float] = {}
+
+    async def wait(self, host: str) -> None:
+        if not self.interval:
+            return
+
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next.get(host, now))
+        self._next[host] = slot + self.interval
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# --------------------------------------------------
+# CLIENT
+# --------------------------------------------------
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    try:
+        return min(float(headers.get("Retry-After", "")), MAX_RETRY_AFTER)
+    except ValueError:
+        return None
+
+
+class WebPriceClient:
+    """
+    Async price-search client over one pooled aiohttp session.
+
+    In-flight requests are bounded by a semaphore (and the connector
+    pool), each host is rate limited, and failed requests (timeouts,
+    connection errors, 429/5xx) are retried with exponential backoff,
+    honouring Retry-After. A slot is only held for the request itself,
+    never across a rate-limit or backoff sleep. Successful responses go through the
+    TTL cache, read and written off the event loop.
+
+        async with WebPriceClient() as client:
+            results = await asyncio.gather(*(client.lookup(q) for q in queries))
+    """
+
+    def __init__(
+        self,
+        endpoint: str = BING_SEARCH_ENDPOINT,
+        api_key: Optional[str] = BING_SEARCH_API_KEY,
+        concurrency: int = WEB_LOOKUP_CONCURRENCY,
+        host_rps: float = WEB_LOOKUP_HOST_RPS,
+        timeout: float = WEB_LOOKUP_TIMEOUT,
+        retries: int = WEB_LOOKUP_RETRIES,
+        cache_ttl: int = WEB_LOOKUP_CACHE_TTL,
+        cache_dir: Path = WEB_LOOKUP_CACHE_DIR,
+    ) -> None:
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+
+        self.cache = ResponseCache(cache_ttl, cache_dir)
+        self._limiter = HostRateLimiter(host_rps)
+        self._host = urlsplit(endpoint).netloc
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.stats = {"requests": 0, "cached": 0, "retries": 0, "failed": 0}
+
+    async def __aenter__(self) -> "WebPriceClient":
+        headers = {"Ocp-Apim-Subscription-Key": self.api_key} if self.api_key else None
+
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.concurrency,
+                ttl_dns_cache=300,
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=headers,
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_json(self, params: Dict[str, Any]) -> Optional[Any]:
+        """
+        GET the endpoint; parsed JSON, or None once retries are exhausted.
+        """
+        assert self._session is not None and self._semaphore is not None
+
+        key = ResponseCache.key(self.endpoint, params)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            self.stats["cached"] += 1
+            return cached
+
+        for attempt in range(self.retries + 1):
+            status: Optional[int] = None
+            delay: Optional[float] = None
+            body: Any = None
+            error = ""
+
+            await self._limiter.wait(self._host)
+            async with self._semaphore:
+                self.stats["requests"] += 1
+
+                try:
+                    async with self._session.get(self.endpoint, params=params) as resp:
+                        status = resp.status
+                        if status == 200:
+                            body = await resp.json(content_type=None)
+                        else:
+                            delay = _retry_after(resp.headers)
+                            error = f"HTTP {status}"
+
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    status = None  # also covers an unreadable 200 body
+                    error = type(e).__name__
+
+            if status == 200:
+                await asyncio.to_thread(self.cache.put, key, body)
+                return body
+
+            if status is not None and status not in RETRY_STATUS:
+                log.warning(f"{params.get('q')!r}: {error}")
+                break
+
+            # back off outside the semaphore so waiting retries don't
+            # starve requests that could go out now
+            if attempt < self.retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(
+                    delay or BACKOFF_BASE * 2**attempt * (1 + random.random())
+                )
+        else:
+            log.warning(f"{params.get('q')!r}: giving up ({error})")
+
+        self.stats["failed"] += 1
+        return None
+
+    async def lookup(self, query: str) -> Optional[Dict]:
+        payload = await self.get_json({"q": query, "count": RESULTS_PER_QUERY})
+        if payload is None:
+            return None
+
+        prices = parse_offer_prices(payload)
+        if not prices:
+            return None
+
+        prices.sort()
+        return {
+            "query": query,
+            "price_low": prices[0],
+            "price_high": prices[-1],
+            "price_median": prices[len(prices) // 2],
+            "offers": len(prices),
+        }
+
+
+# --------------------------------------------------
+# QUERIES / PARSING
+# --------------------------------------------------
+
+
+QUERY_ATTRIBUTES = ("colour", "material")
+
+
+def query_attributes(item: Dict) -> List[str]:
+    """
+    Attribute labels that make an item's query more than its class name.
+    Empty when attributes are off: every item of the class then gets the
+    same class-wide price.
+    """
+    attrs = item.get("attributes") or {}
+    return [attrs[name]["label"] for name in QUERY_ATTRIBUTES if name in attrs]
+
+
+def build_query(item: Dict) -> Optional[str]:
+    """
+    "black leather handbag price" — zero-shot attributes sharpen the query.
+    None for non-product classes (people), which are never looked up.
+    """
+    if item["item"] in NON_PRODUCT_CLASSES:
+        return None
+
+    return " ".join([*query_attributes(item), item["item"], "price"])
+
+
+def parse_offer_prices(payload: Dict) -> List[float]:
+    """
+    Offer prices from a Bing image-search response
+    (value[].insightsMetadata.aggregateOffer.lowPrice / highPrice).
+    """
+    prices: List[float] = []
+    for result in payload.get("value") or []:
+        offer = (result.get("insightsMetadata") or {}).get("aggregateOffer") or {}
+        for field in ("lowPrice", "highPrice"):
+            value = offer.get(field)
+            if isinstance(value, (int, float)) and value > 0:
+                prices.append(float(value))
+    return prices
+
+
+# --------------------------------------------------
+# PUBLIC API
+# --------------------------------------------------
+
+
+async def lookup_prices_async(
+    items: Sequence[Dict],
+    **client_kwargs: Any,
+) -> List[Optional[Dict]]:
+    """
+    Look every product up concurrently; identical queries are sent once.
+    """
+    queries = [build_query(item) for item in items]
+    unique = list(dict.fromkeys(q for q in queries if q is not None))
+    if not unique:
+        return [None] * len(items)
+
+    async with WebPriceClient(**client_kwargs) as client:
+        results = await asyncio.gather(*(client.lookup(q) for q in unique))
+
+    log.info(
+        f"{len(unique)} queries: {client.stats['requests']} requests, "
+        f"{client.stats['cached']} cached, {client.stats['retries']} retries, "
+        f"{client.stats['failed']} failed"
+    )
+
+    by_query = dict(zip(unique, results))
+    return [by_query[q] if q is not None else None for q in queries]
+
+
+def lookup_prices(
+    items: Sequence[Dict],
+    **client_kwargs: Any,
+) -> List[Optional[Dict]]:
+    """
+    Sync entry point for the pipeline: one event loop per video.
+    None for non-products and items without usable offers.
+    """
+
+    log_section("Web Price Lookup")
+
+    if not items:
+        return []
+
+    start = time.perf_counter()
+    results = asyncio.run(lookup_prices_async(items, **client_kwargs))
+
+    found = sum(r is not None for r in results)
+    log.info(
+        f"Web prices for {found}/{len(items)} items "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+    return results
@@ -1,28 +1,185 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 
 from src.utils.logger import get_logger, log_section
 from src.ingestion.video_downloader import download_video
 from src.processing.frame_extractor import extract_frames
+from src.processing.frame_dedup import FrameDeduplicator
+from src.processing.frame_store import FrameStore
+from src.detection.detection_batch import DetectionBatch
 from src.detection.object_detector import FashionObjectDetector
-from src.detection.item_tracker import track_items
+from src.detection.item_tracker import StreamingItemTracker, track_items
+from src.classification.reidentify import merge_duplicate_items
 
-from src.crops.cropper import crop_items
+from src.crops.cropper import crop_items, start_crop_run
 from src.crops.quality_check import filter_crops
 
-from src.crops.face_cropper import crop_face_from_person
-from src.classification.glasses_classifier import classify_glasses
+from src.classification.clip_model import warm_up_clip
+from src.classification.attribute_engine import (
+    FACE,
+    NON_ITEM_KINDS,
+    get_attribute_engine,
+    rounded,
+)
+from src.classification.glasses_classifier import glasses_label
 
 from src.enrichment.price_estimator import estimate_prices
 from src.video.overlay import render_overlay
 
 from src.config.paths import FACE_DIR
+from src.config.settings import (
+    CLIP_WARMUP,
+    ENABLE_ATTRIBUTES,
+    ENABLE_FRAME_DEDUP,
+    ENABLE_REID,
+    PIPELINE_STREAMING,
+    TRACKER_MODE,
+)
 
 log = get_logger("orchestrator")
 
 
+# --------------------------------------------------
+# STAGES
+# --------------------------------------------------
+
+StageResult = Tuple[List[Dict], List[Dict], List[Dict]]  # crops, good, rejected
+
+
+def _warm_up_on_demand(detections: DetectionBatch) -> None:
+    """
+    Start the background CLIP load (CLIP_WARMUP) once detections show
+    it will be needed: a person (face → glasses), or any item when
+    attributes are on. Runs without such detections never load CLIP.
+    """
+    if not CLIP_WARMUP or not len(detections):
+        return
+    if ENABLE_ATTRIBUTES or "person" in detections.item_names():
+        warm_up_clip()
+
+
+def _crop_and_check(
+    unique_items: List[Dict],
+    video_id: str,
+    frame_store: FrameStore,
+) -> StageResult:
+    """
+    Face crops, item crops and quality filtering for a set of tracked items.
+    """
+
+    # --------------------------------------------------
+    # 5. CROPPING (FASHION ITEMS + PERSON FACES)
+    #    scored in memory, rejects never hit disk
+    # --------------------------------------------------
+
+    crops = crop_items(
+        tracked_items=unique_items,
+        video_id=video_id,
+        frame_store=frame_store,
+        face_dir=FACE_DIR,
+        assess=True,
+    )
+
+    if not crops:
+        return crops, [], []
+
+    # --------------------------------------------------
+    # 6. QUALITY FILTER
+    # --------------------------------------------------
+
+    good_crops, rejected = filter_crops(crops)
+
+    return crops, good_crops, rejected
+
+
+def _detect_batch(
+    detector: FashionObjectDetector,
+    frame_data: Dict,
+    frame_store: FrameStore,
+    video_id: str,
+) -> Optional[StageResult]:
+    """
+    Detect every frame, then track, then crop.
+    """
+
+    # --------------------------------------------------
+    # 3. OBJECT DETECTION
+    # --------------------------------------------------
+
+    detections = detector.detect(frame_data["frames"], frame_store)
+
+    if not detections:
+        log.warning("No fashion items detected — stopping pipeline")
+        return None
+
+    _warm_up_on_demand(detections)
+
+    # --------------------------------------------------
+    # 4. ITEM TRACKING (DEDUP)
+    # --------------------------------------------------
+
+    unique_items = track_items(
+        detections,
+        frame_weights=frame_data["frame_weights"],
+    )
+
+    if not unique_items:
+        log.warning("All detections deduplicated away — stopping")
+        return None
+
+    return _crop_and_check(unique_items, video_id, frame_store)
+
+
+def _detect_streaming(
+    detector: FashionObjectDetector,
+    frame_data: Dict,
+    frame_store: FrameStore,
+    video_id: str,
+) -> Optional[StageResult]:
+    """
+    Feed detection batches into the incremental tracker and crop /
+    quality-check items on a worker thread as soon as their tracks
+    close, while detection continues on later frames.
+    """
+    tracker = StreamingItemTracker(frame_weights=frame_data["frame_weights"])
+    pending: List[Future] = []
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="crop") as pool:
+        for batch in detector.detect_stream(frame_data["frames"], frame_store):
+            _warm_up_on_demand(batch)
+            closed = tracker.update(batch)
+            if closed:
+                pending.append(
+                    pool.submit(_crop_and_check, closed, video_id, frame_store)
+                )
+
+        remaining = tracker.finalize()
+        if remaining:
+            pending.append(
+                pool.submit(_crop_and_check, remaining, video_id, frame_store)
+            )
+
+        results = [future.result() for future in pending]
+
+    if not tracker.detections_seen:
+        log.warning("No fashion items detected — stopping pipeline")
+        return None
+
+    log.info(
+        f"Tracked {tracker.detections_seen} detections → "
+        f"{tracker.items_emitted} items"
+    )
+
+    crops = [c for r in results for c in r[0]]
+    good_crops = [c for r in results for c in r[1]]
+    rejected = [c for r in results for c in r[2]]
+
+    return crops, good_crops, rejected
+
+
 # --------------------------------------------------
 # ORCHESTRATOR
 # --------------------------------------------------
@@ -46,14 +203,19 @@ def run(
     video_meta: Dict = download_video(url)
     video_id = video_meta["video_id"]
     video_path: Path = video_meta["path"]
+    start_crop_run(video_id)
 
     # --------------------------------------------------
     # 2. FRAME EXTRACTION
     # --------------------------------------------------
 
+    frame_store = FrameStore()
+
     frame_data = extract_frames(
         video_path=video_path,
         video_id=video_id,
+        frame_store=frame_store,
+        deduplicator=FrameDeduplicator() if ENABLE_FRAME_DEDUP else None,
     )
 
     if not frame_data["frames"]:
@@ -61,76 +223,70 @@ def run(
         return None
 
     # --------------------------------------------------
-    # 3. OBJECT DETECTION
+    # 3-6. DETECTION → TRACKING → CROPS → QUALITY
     # --------------------------------------------------
 
     detector = FashionObjectDetector()
-    detections = detector.detect(frame_data["frames"])
 
-    if not detections:
-        log.warning("No fashion items detected — stopping pipeline")
+    if PIPELINE_STREAMING and TRACKER_MODE == "sort":
+        stages = _detect_streaming(detector, frame_data, frame_store, video_id)
+    else:
+        if PIPELINE_STREAMING:
+            log.warning("PIPELINE_STREAMING needs TRACKER_MODE=sort — running batch")
+        stages = _detect_batch(detector, frame_data, frame_store, video_id)
+
+    if stages is None:
         return None
 
-    # --------------------------------------------------
-    # 4. ITEM TRACKING (DEDUP)
-    # --------------------------------------------------
+    crops, good_crops, rejected = stages
 
-    unique_items = track_items(detections)
+    if not crops:
+        log.warning("No crops created — stopping")
+        return None
 
-    if not unique_items:
-        log.warning("All detections deduplicated away — stopping")
+    if not good_crops:
+        log.warning("All crops failed quality checks — stopping")
         return None
 
     # --------------------------------------------------
-    # 4.5 FACE CROPPING (PERSON ONLY)
+    # 6.2 RE-IDENTIFICATION (OPTIONAL)
     # --------------------------------------------------
 
-    for item in unique_items:
-        if item.get("item") != "person":
-            continue
-
-        face_path = crop_face_from_person(
-            frame_path=item["frame"],
-            person_bbox=item["bbox"],
-            output_path=FACE_DIR / f"{item['id']}_face.jpg",
-        )
-
-        if face_path:
-            item["face_crop"] = face_path
+    if ENABLE_REID:
+        good_crops = merge_duplicate_items(good_crops)
 
     # --------------------------------------------------
-    # 5. CROPPING (FASHION ITEMS)
+    # 6.5 ATTRIBUTES (GLASSES ON FACES, ZERO-SHOT ON CROPS)
+    #     one CLIP encode per image, all prompt sets at once
     # --------------------------------------------------
 
-    crops = crop_items(
-        tracked_items=unique_items,
-        video_id=video_id,
-    )
+    log_section("Attribute Classification")
 
-    if not crops:
-        log.warning("No crops created — stopping")
-        return None
-
-    # --------------------------------------------------
-    # 6. QUALITY FILTER
-    # --------------------------------------------------
-
-    good_crops, rejected = filter_crops(crops)
+    faces = [item for item in good_crops if item.get("face_crop")]
+    described = (
+        [item for item in good_crops if item["item"] not in NON_ITEM_KINDS]
+        if ENABLE_ATTRIBUTES
+        else []
+    )
 
-    if not good_crops:
-        log.warning("All crops failed quality checks — stopping")
-        return None
+    images = [
+        item["face_image"] if item.get("face_image") is not None
+        else item["face_crop"]
+        for item in faces
+    ] + [
+        item["crop_image"] if item.get("crop_image") is not None
+        else item["crop_path"]
+        for item in described
+    ]
+    kinds = [FACE] * len(faces) + [item["item"] for item in described]
 
-    # --------------------------------------------------
-    # 6.5 GLASSES CLASSIFICATION (FACE ONLY)
-    # --------------------------------------------------
+    attributes = get_attribute_engine().classify(images, kinds)
 
-    for item in good_crops:
-        face = item.get("face_crop")
-        if not face:
-            continue
+    for item, attrs in zip(faces, attributes[: len(faces)]):
+        item["glasses"] = glasses_label(attrs["glasses"])
 
-        item["glasses"] = classify_glasses(face)
+    for item, attrs in zip(described, attributes[len(faces) :]):
+        item["attributes"] = rounded(attrs)
 
     # --------------------------------------------------
     # 7. PRICE ESTIMATION
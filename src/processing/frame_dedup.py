@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from src.config.settings import FRAME_DEDUP_HAMMING, FRAME_DEDUP_WINDOW
+from src.processing.frame_store import FrameRef
+from src.utils.logger import get_logger
+
+log = get_logger("frame-dedup")
+
+
+# --------------------------------------------------
+# HASHING
+# --------------------------------------------------
+
+
+def dhash(image: np.ndarray, hash_size: int = 8) -> int:
+    """
+    Difference hash: 64-bit fingerprint of a downscaled grayscale frame.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+# --------------------------------------------------
+# DEDUPLICATOR
+# --------------------------------------------------
+
+
+class FrameDeduplicator:
+    """
+    Drops frames whose hash is within `threshold` bits of one of the
+    last `window` kept frames.
+
+    Every dropped frame is mapped to the kept frame that represents it,
+    so detections on a kept frame can be weighted accordingly.
+    """
+
+    def __init__(
+        self,
+        threshold: int = FRAME_DEDUP_HAMMING,
+        window: int = FRAME_DEDUP_WINDOW,
+    ) -> None:
+        self.threshold = threshold
+        self._recent: Deque[Tuple[FrameRef, int]] = deque(maxlen=max(1, window))
+        self.representatives: Dict[FrameRef, FrameRef] = {}
+        self.kept: List[FrameRef] = []
+
+    def add(self, ref: FrameRef, frame: np.ndarray) -> bool:
+        """
+        Returns True if the frame should be kept.
+        """
+        h = dhash(frame)
+
+        for kept_ref, kept_hash in reversed(self._recent):
+            if _hamming(h, kept_hash) <= self.threshold:
+                self.representatives[ref] = kept_ref
+                return False
+
+        self._recent.append((ref, h))
+        self.kept.append(ref)
+        return True
+
+    def weights(self) -> Dict[FrameRef, int]:
+        """
+        Number of sampled frames each kept frame stands for.
+        """
+        counts = {ref: 1 for ref in self.kept}
+        for kept_ref in self.representatives.values():
+            counts[kept_ref] = counts.get(kept_ref, 1) + 1
+        return counts
+
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import cv2
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from src.config.settings import FRAME_SAMPLE_RATE
-from src.config.paths import FRAMES_DIR
+from src.config.settings import FRAME_SAMPLE_RATE, FRAME_SAMPLING_MODE
+from src.processing.frame_sampler import iter_sampled_frames, probe_video
+from src.processing.frame_dedup import FrameDeduplicator
+from src.processing.frame_store import FrameRef, FrameStore
+from src.processing.shot_detector import plan_adaptive_indices
 from src.utils.logger import get_logger, ProgressTracker, log_section
 
 log = get_logger("frame-extractor")
@@ -31,66 +34,95 @@ def _is_blurry(image, threshold: float = 100.0) -> bool:
 def extract_frames(
     video_path: Path,
     video_id: str,
+    frame_store: Optional[FrameStore] = None,
+    mode: str = FRAME_SAMPLING_MODE,
+    deduplicator: Optional[FrameDeduplicator] = None,
 ) -> Dict:
     """
-    Extract sampled frames from a video.
+    Extract sampled frames from a video into the frame store.
+    JPEGs are only written when the store's disk sink is enabled, or
+    when the video has more kept frames than the store can hold.
+
+    mode:
+        fixed    → every FRAME_SAMPLE_RATE-th frame
+        adaptive → shot-aware, FRAME_BUDGET frames spread across shots
+
+    With a deduplicator, near-duplicate frames are dropped before they
+    reach the store; `frame_weights` says how many frames each kept
+    frame stands for.
 
     Returns:
         {
             "video_id": str,
             "total_frames": int,
             "extracted_frames": int,
-            "frames": List[Path]
+            "frames": List[FrameRef],
+            "frame_weights": Dict[FrameRef, int],
+            "duplicates": Dict[FrameRef, FrameRef],  # dropped → kept
+            "frame_store": FrameStore
         }
     """
 
     log_section("Frame Extraction")
     log.info(f"Video: {video_path.name}")
 
-    cap = cv2.VideoCapture(str(video_path))
-    if not cap.isOpened():
-        raise RuntimeError(f"Cannot open video: {video_path}")
-
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    _, _, total_frames, _ = probe_video(video_path)
 
-    output_dir = FRAMES_DIR / video_id
-    output_dir.mkdir(parents=True, exist_ok=True)
+    store = frame_store if frame_store is not None else FrameStore()
+    store.register_video(video_id, video_path)
 
-    saved_frames: List[Path] = []
-    frame_idx = 0
+    saved_frames: List[FrameRef] = []
     saved_count = 0
 
+    if mode == "adaptive":
+        indices: Optional[List[int]] = plan_adaptive_indices(video_path)
+        expected = len(indices)
+    else:
+        indices = None
+        expected = -(-total_frames // FRAME_SAMPLE_RATE)
+
     with ProgressTracker(
         title="Extracting frames",
-        total=total_frames,
+        total=expected,
     ) as progress:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            if frame_idx % FRAME_SAMPLE_RATE == 0:
-                if not _is_blurry(frame):
-                    frame_name = f"frame_{frame_idx:06d}.jpg"
-                    frame_path = output_dir / frame_name
-
-                    cv2.imwrite(str(frame_path), frame)
-                    saved_frames.append(frame_path)
+        for frame_idx, frame in iter_sampled_frames(
+            video_path,
+            sample_rate=FRAME_SAMPLE_RATE,
+            indices=indices,
+        ):
+            if not _is_blurry(frame):
+                ref = FrameRef(video_id, frame_idx)
+                if deduplicator is None or deduplicator.add(ref, frame):
+                    if saved_count == store.capacity:
+                        # the next put would evict a frame detection
+                        # has not seen yet
+                        store.spill_to_disk(video_id)
+                    saved_frames.append(store.put(video_id, frame_idx, frame))
                     saved_count += 1
 
-            frame_idx += 1
             progress.advance()
 
-    cap.release()
-
     log.info(
         f"Extracted {saved_count} frames "
         f"from {total_frames} total frames"
     )
+    if deduplicator is not None:
+        log.info(
+            f"Suppressed {len(deduplicator.representatives)} near-duplicate frames"
+        )
 
     return {
         "video_id": video_id,
         "total_frames": total_frames,
         "extracted_frames": saved_count,
         "frames": saved_frames,
+        "frame_weights": (
+            deduplicator.weights()
+            if deduplicator is not None
+            else {ref: 1 for ref in saved_frames}
+        ),
+        "duplicates": (
+            deduplicator.representatives if deduplicator is not None else {}
+        ),
+        "frame_store": store,
     }
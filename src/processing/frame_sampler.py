@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import itertools
+import re
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.config.settings import FRAME_SAMPLER_BACKEND, FRAME_SEEK_MIN_GAP
+from src.utils.logger import get_logger
+
+log = get_logger("frame-sampler")
+
+
+# --------------------------------------------------
+# TYPES
+# --------------------------------------------------
+
+SampledFrame = Tuple[int, np.ndarray]
+Size = Tuple[int, int]  # (width, height)
+
+BACKENDS = ("read", "grab", "seek", "ffmpeg")
+
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+
+def _wanted_indices(
+    sample_rate: Optional[int],
+    indices: Optional[Sequence[int]],
+) -> Iterator[int]:
+    """
+    Ascending stream of frame indices to keep.
+    A stride is open-ended so we never trust CAP_PROP_FRAME_COUNT.
+    """
+    if indices is not None:
+        return iter(sorted(set(int(i) for i in indices if i >= 0)))
+    return itertools.count(0, sample_rate or 1)
+
+
+def _resize(frame: np.ndarray, size: Optional[Size]) -> np.ndarray:
+    if size is None:
+        return frame
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def probe_video(video_path: Path) -> Tuple[int, int, int, float]:
+    """
+    Returns (width, height, frame_count, fps).
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {video_path}")
+
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+
+    cap.release()
+    return width, height, count, fps
+
+
+# --------------------------------------------------
+# OPENCV BACKENDS
+# --------------------------------------------------
+
+
+def _iter_opencv(
+    video_path: Path,
+    wanted: Iterator[int],
+    backend: str,
+    size: Optional[Size],
+) -> Iterator[SampledFrame]:
+    """
+    read  → decode and convert every frame (legacy behaviour, baseline)
+    grab  → grab() every frame, retrieve() only the ones we keep. With
+            OpenCV's FFmpeg backend grab() still decodes each frame;
+            what is skipped is the colour conversion and copy of the
+            frames we drop, so the gain is modest
+    seek  → jump to the keyframe before far-away targets, grab otherwise
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {video_path}")
+
+    target = next(wanted, None)
+    frame_idx = 0
+
+    try:
+        while target is not None:
+            if backend == "seek" and target - frame_idx >= FRAME_SEEK_MIN_GAP:
+                # OpenCV/FFmpeg seeks to the previous keyframe and
+                # decodes forward to the exact position
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                frame_idx = target
+
+            if backend == "read":
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                if frame_idx == target:
+                    yield frame_idx, _resize(frame, size)
+                    target = next(wanted, None)
+                frame_idx += 1
+                continue
+
+            if not cap.grab():
+                break
+
+            if frame_idx == target:
+                ok, frame = cap.retrieve()
+                if ok and frame is not None:
+                    yield frame_idx, _resize(frame, size)
+                target = next(wanted, None)
+
+            frame_idx += 1
+    finally:
+        cap.release()
+
+
+# --------------------------------------------------
+# FFMPEG BACKEND
+# --------------------------------------------------
+
+
+FFMPEG_FPS_MODE_VERSION = (5, 1)  # first release with -fps_mode
+
+
+def _progressions(indices: List[int]) -> List[Tuple[int, int, int]]:
+    """
+    Ascending unique indices → (first, last, step) arithmetic runs.
+    Stride and per-shot spacing collapse to a handful of runs.
+    """
+    runs: List[Tuple[int, int, int]] = []
+    i = 0
+    while i < len(indices):
+        first = indices[i]
+        if i + 1 == len(indices):
+            runs.append((first, first, 1))
+            break
+
+        step = indices[i + 1] - first
+        j = i + 1
+        while j + 1 < len(indices) and indices[j + 1] - indices[j] == step:
+            j += 1
+
+        runs.append((first, indices[j], step))
+        i = j + 1
+    return runs
+
+
+def _run_expr(first: int, last: int, step: int) -> str:
+    if first == last:
+        return f"eq(n\\,{first})"
+    if step == 1:
+        return f"between(n\\,{first}\\,{last})"
+    return f"between(n\\,{first}\\,{last})*not(mod(n-{first}\\,{step}))"
+
+
+def _select_expr(runs: Sequence[Tuple[int, int, int]]) -> str:
+    """
+    Runs → one `select` expression, as a balanced if(lt(n,…)) tree over
+    the (disjoint, ascending) runs: each frame evaluates O(log runs)
+    terms instead of all of them.
+    """
+    if len(runs) == 1:
+        return _run_expr(*runs[0])
+
+    mid = len(runs) // 2
+    left = _select_expr(runs[:mid])
+    right = _select_expr(runs[mid:])
+    return f"if(lt(n\\,{runs[mid][0]})\\,{left}\\,{right})"
+
+
+@lru_cache(maxsize=1)
+def _ffmpeg_sync_args() -> List[str]:
+    """
+    -fps_mode on ffmpeg >= 5.1, the deprecated -vsync before that.
+    Unparseable versions (git builds) are assumed current.
+    """
+    try:
+        out = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-version"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise RuntimeError("ffmpeg backend selected but ffmpeg is not runnable") from e
+
+    match = re.search(r"version n?(\d+)\.(\d+)", out)
+    if match and tuple(map(int, match.groups())) < FFMPEG_FPS_MODE_VERSION:
+        return ["-vsync", "passthrough"]
+    return ["-fps_mode", "passthrough"]
+
+
+def _ffmpeg_pass(
+    video_path: Path,
+    select: str,
+    size: Optional[Size],
+    out_size: Size,
+    max_frames: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """
+    One ffmpeg decode through a `select`+`scale` filter, raw BGR frames
+    read from a pipe. Dropped frames never reach the scaler or Python.
+    """
+    out_w, out_h = out_size
+
+    filters = [f"select='{select}'"]
+    if size is not None:
+        filters.append(f"scale={out_w}:{out_h}:flags=area")
+
+    cmd = [
+        "ffmpeg",
+        "-loglevel", "error",
+        "-nostdin",
+        "-i", str(video_path),
+        "-an", "-sn",
+        "-vf", ",".join(filters),
+        *_ffmpeg_sync_args(),
+    ]
+    if max_frames is not None:
+        cmd += ["-frames:v", str(max_frames)]  # stop decoding after the last pick
+    cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+
+    frame_bytes = out_w * out_h * 3
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert proc.stdout is not None
+
+    try:
+        while True:
+            buf = proc.stdout.read(frame_bytes)
+            if len(buf) < frame_bytes:
+                break
+            yield np.frombuffer(buf, dtype=np.uint8).reshape(out_h, out_w, 3).copy()
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.terminate()
+        proc.wait()
+        if proc.returncode not in (0, -15) and proc.stderr is not None:
+            err = proc.stderr.read().decode(errors="ignore").strip()
+            if err:
+                log.warning(f"ffmpeg: {err}")
+        if proc.stderr is not None:
+            proc.stderr.close()
+
+
+def _iter_ffmpeg(
+    video_path: Path,
+    sample_rate: Optional[int],
+    indices: Optional[Sequence[int]],
+    size: Optional[Size],
+) -> Iterator[SampledFrame]:
+    """
+    Always a single decode pass. A stride is `not(mod(n,k))`; explicit
+    indices are compressed into arithmetic runs and selected through
+    one if() tree (see _select_expr).
+    """
+    src_w, src_h, _, _ = probe_video(video_path)
+    out_size = size if size is not None else (src_w, src_h)
+
+    if indices is None:
+        frames = _ffmpeg_pass(
+            video_path, f"not(mod(n\\,{sample_rate}))", size, out_size
+        )
+        yield from zip(itertools.count(0, sample_rate), frames)
+        return
+
+    wanted = sorted(set(int(i) for i in indices if i >= 0))
+    if not wanted:
+        return
+
+    frames = _ffmpeg_pass(
+        video_path,
+        _select_expr(_progressions(wanted)),
+        size,
+        out_size,
+        max_frames=len(wanted),
+    )
+    yield from zip(wanted, frames)
+
+
+# --------------------------------------------------
+# PUBLIC API
+# --------------------------------------------------
+
+
+def iter_sampled_frames(
+    video_path: Path,
+    *,
+    sample_rate: Optional[int] = None,
+    indices: Optional[Iterable[int]] = None,
+    backend: Optional[str] = None,
+    size: Optional[Size] = None,
+) -> Iterator[SampledFrame]:
+    """
+    Yield (frame_idx, BGR frame) for every `sample_rate`-th frame,
+    or for an explicit set of frame indices.
+
+    Only the kept frames are converted to BGR and copied out (`read`
+    converts all of them); the OpenCV backends still decode every frame
+    up to the last pick, `ffmpeg` drops unwanted frames inside its
+    filter graph. `size` optionally downscales to (width, height).
+    """
+    backend = (backend or FRAME_SAMPLER_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown frame sampler backend: {backend}")
+
+    index_list = list(indices) if indices is not None else None
+    if index_list is None and (not sample_rate or sample_rate < 1):
+        raise ValueError("sample_rate must be >= 1 when indices are not given")
+
+    if backend == "ffmpeg":
+        return _iter_ffmpeg(video_path, sample_rate, index_list, size)
+
+    return _iter_opencv(
+        video_path,
+        _wanted_indices(sample_rate, index_list),
+        backend,
+        size,
+    )
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+from src.config.settings import FRAME_STORE_CAPACITY, PERSIST_FRAMES
+from src.config.paths import FRAMES_DIR
+from src.processing.frame_sampler import iter_sampled_frames
+from src.utils.logger import get_logger
+
+log = get_logger("frame-store")
+
+
+# --------------------------------------------------
+# FRAME REFERENCE
+# --------------------------------------------------
+
+
+@dataclass(frozen=True, order=True)
+class FrameRef:
+    """
+    Lightweight handle to a sampled frame.
+    Passed between stages instead of a JPEG path.
+    """
+
+    video_id: str
+    frame_idx: int
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.video_id, self.frame_idx
+
+    @property
+    def stem(self) -> str:
+        return f"frame_{self.frame_idx:06d}"
+
+    @property
+    def name(self) -> str:
+        return f"{self.stem}.jpg"
+
+
+# --------------------------------------------------
+# STORE
+# --------------------------------------------------
+
+
+class FrameStore:
+    """
+    Bounded LRU of decoded frames keyed by (video_id, frame_idx).
+
+    Lookup order on get():
+    1. in-memory LRU
+    2. persisted JPEG (disk sink enabled, or the video spilled to disk)
+    3. frame-exact re-decode from the source video (last resort)
+
+    A video with more sampled frames than `capacity` is spilled: its
+    frames are also written as JPEGs, so evicted frames are read back
+    from disk instead of being re-decoded one by one.
+
+    Thread-safe; one instance is shared by every stage of a run.
+    """
+
+    def __init__(
+        self,
+        capacity: int = FRAME_STORE_CAPACITY,
+        persist: bool = PERSIST_FRAMES,
+        persist_dir: Path = FRAMES_DIR,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.persist = persist
+        self.persist_dir = persist_dir
+
+        self._frames: "OrderedDict[Tuple[str, int], np.ndarray]" = OrderedDict()
+        self._sources: Dict[str, Path] = {}
+        self._spilled: Set[str] = set()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # --------------------------------------------------
+    # SOURCES
+    # --------------------------------------------------
+
+    def register_video(self, video_id: str, video_path: Path) -> None:
+        with self._lock:
+            self._sources[video_id] = video_path
+
+    def source(self, video_id: str) -> Optional[Path]:
+        with self._lock:
+            return self._sources.get(video_id)
+
+    def path_for(self, ref: FrameRef) -> Path:
+        return self.persist_dir / ref.video_id / ref.name
+
+    def _on_disk(self, video_id: str) -> bool:
+        return self.persist or video_id in self._spilled
+
+    def spill_to_disk(self, video_id: str) -> None:
+        """
+        Write this video's frames (resident and future) as JPEGs.
+        Called once the video outgrows the LRU.
+        """
+        with self._lock:
+            if self._on_disk(video_id):
+                return
+            self._spilled.add(video_id)
+            resident = [
+                (FrameRef(*key), frame)
+                for key, frame in self._frames.items()
+                if key[0] == video_id
+            ]
+
+        log.info(
+            f"{video_id}: more frames than FRAME_STORE_CAPACITY={self.capacity}, "
+            f"spilling to {self.persist_dir / video_id}"
+        )
+        for ref, frame in resident:
+            self._write(ref, frame)
+
+    def _write(self, ref: FrameRef, frame: np.ndarray) -> None:
+        path = self.path_for(ref)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(path), frame)
+
+    # --------------------------------------------------
+    # WRITE
+    # --------------------------------------------------
+
+    def put(self, video_id: str, frame_idx: int, frame: np.ndarray) -> FrameRef:
+        ref = FrameRef(video_id, frame_idx)
+        self._insert(ref, frame)
+
+        if self._on_disk(video_id):
+            self._write(ref, frame)
+
+        return ref
+
+    def _insert(self, ref: FrameRef, frame: np.ndarray) -> None:
+        with self._lock:
+            self._frames[ref.key] = frame
+            self._frames.move_to_end(ref.key)
+            while len(self._frames) > self.capacity:
+                self._frames.popitem(last=False)
+
+    # --------------------------------------------------
+    # READ
+    # --------------------------------------------------
+
+    def get(self, ref: FrameRef) -> Optional[np.ndarray]:
+        with self._lock:
+            frame = self._frames.get(ref.key)
+            if frame is not None:
+                self._frames.move_to_end(ref.key)
+                self.hits += 1
+                return frame
+            self.misses += 1
+
+        frame = self._load(ref)
+        if frame is not None:
+            self._insert(ref, frame)
+        return frame
+
+    def _load(self, ref: FrameRef) -> Optional[np.ndarray]:
+        if self._on_disk(ref.video_id):
+            path = self.path_for(ref)
+            if path.exists():
+                image = cv2.imread(str(path))
+                if image is not None:
+                    return image
+
+        source = self._sources.get(ref.video_id)
+        if source is None:
+            log.warning(f"Frame evicted and no source registered: {ref}")
+            return None
+
+        # grab counts frames from the start, so the index is exact
+        # (seek lands on keyframes and may be off by a few frames)
+        log.warning(f"Re-decoding evicted frame: {ref}")
+        for frame_idx, frame in iter_sampled_frames(
+            source,
+            indices=[ref.frame_idx],
+            backend="grab",
+        ):
+            if frame_idx == ref.frame_idx:
+                return frame
+
+        log.warning(f"Could not re-decode frame: {ref}")
+        return None
+
+    # --------------------------------------------------
+    # MISC
+    # --------------------------------------------------
+
+    def __contains__(self, ref: object) -> bool:
+        if not isinstance(ref, FrameRef):
+            return False
+        with self._lock:
+            return ref.key in self._frames
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+
+def frame_digest(frame: np.ndarray) -> str:
+    """
+    Content hash of a decoded image (pixels + shape); cache key for
+    frames and crops.
+    """
+    data = np.ascontiguousarray(frame)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(data.shape).encode())
+    h.update(memoryview(data).cast("B"))
+    return h.hexdigest()
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Content hash of a file (e.g. a downloaded video), read in chunks.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, TypeVar
+
+from src.config.settings import CROP_WORKERS
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# --------------------------------------------------
+# ORDERED THREAD MAP
+# --------------------------------------------------
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    workers: int = CROP_WORKERS,
+    name: str = "worker",
+) -> List[R]:
+    """
+    Map `fn` over `items` on a thread pool; results keep input order.
+
+    Meant for OpenCV-heavy work (decode, cvtColor, Laplacian, imencode)
+    which releases the GIL. workers <= 1 runs inline.
+    """
+    items = list(items)
+
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(
+        max_workers=min(workers, len(items)),
+        thread_name_prefix=name,
+    ) as pool:
+        return list(pool.map(fn, items))